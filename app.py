@@ -3,36 +3,72 @@ Hacker Hub - Complete Web Application
 Production-ready with all console features
 """
 
+import time
+_import_started = time.perf_counter()
+
 import os
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from functools import wraps
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_bcrypt import Bcrypt
 from flask_cors import CORS
-from flask_migrate import Migrate
-from flask_mail import Mail
 from config import Config
 from database import db, User, Tool, UserTool, Post, Comment, CTFChallenge
+from search import search_tools, ensure_search_index
+from counters import hit_counter
+from hashing import password_hasher
+from fragments import fragment_cache
+from probes import ping_database, row_counts
+from metrics import metrics
+from querybudget import query_budget_guard, unbudgeted
+from identity import load_user as load_cached_user
+from guests import GuestUser, is_guest_id, persistent_user, anonymous_sweeper, sweep_anonymous_command
+from stats import get_user_stats, get_recent_tools
+from recommend import get_recommended_tools
+from queryplan import explain_queries_command
+from importer import import_tools, import_tools_command, detect_format
+from similarity import related_tools_command
+from snapshot import current_snapshot, snapshot_stats, export_catalog_command
+from startup import LazyExtension, record_startup
+
+_import_ms = (time.perf_counter() - _import_started) * 1000
 
 # Initialize extensions
 login_manager = LoginManager()
-bcrypt = Bcrypt()
-mail = Mail()
-migrate = Migrate()
+bcrypt = LazyExtension('flask_bcrypt', 'Bcrypt')
+mail = LazyExtension('flask_mail', 'Mail')
+migrate = LazyExtension('flask_migrate', 'Migrate', db)
 
-def create_app():
+def create_app(config_class=Config, lean=None):
+    create_started = time.perf_counter()
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    if lean is not None:
+        app.config['LEAN_STARTUP'] = lean
     
     # Initialize extensions with app
     db.init_app(app)
+    metrics.init_app(app)  # first, so request timings cover the other hooks
+    query_budget_guard.init_app(app)
     login_manager.init_app(app)
-    bcrypt.init_app(app)
-    mail.init_app(app)
-    migrate.init_app(app, db)
+    if not app.config['LEAN_STARTUP']:
+        # Lean mode binds Bcrypt and Mail on first use and leaves out
+        # Flask-Migrate (alembic), which only the `flask db` commands need
+        bcrypt.init_app(app)
+        mail.init_app(app)
+        migrate.init_app(app)
+    hit_counter.init_app(app)
+    password_hasher.init_app(app)
+    fragment_cache.init_app(app)
+    row_counts.init_app(app)
+    anonymous_sweeper.init_app(app)
     CORS(app)
+    app.cli.add_command(explain_queries_command)
+    app.cli.add_command(import_tools_command)
+    app.cli.add_command(related_tools_command)
+    app.cli.add_command(export_catalog_command)
+    app.cli.add_command(sweep_anonymous_command)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -41,7 +77,16 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        if is_guest_id(user_id):
+            return GuestUser.load(user_id)
+        user = load_cached_user(int(user_id))
+        if user is not None and user.anonymous:
+            # Anonymous rows have no logins; keep them clear of the sweeper while in use
+            now = datetime.utcnow()
+            if user.last_login is None or now - user.last_login > timedelta(days=1):
+                user.last_login = now
+                db.session.commit()
+        return user
     
     # Import blueprints
     from auth import auth_bp
@@ -68,23 +113,13 @@ def create_app():
         """Main dashboard"""
         user = current_user
         
-        # Get user stats
-        stats = {
-            'followed_tools': len(user.followed_tools),
-            'posts': len(user.posts),
-            'comments': len(user.comments)
-        }
-        
-        # Get recent tools
-        recent_tools = Tool.query.order_by(Tool.created_at.desc()).limit(5).all()
+        # Get user stats (one aggregate query, cached per user)
+        stats = get_user_stats(user.id)
         
-        # Get recommended tools based on experience
-        if user.experience == 'beginner':
-            recommended = Tool.query.filter_by(difficulty='beginner').limit(3).all()
-        elif user.experience == 'intermediate':
-            recommended = Tool.query.filter(Tool.difficulty.in_(['beginner', 'intermediate'])).limit(3).all()
-        else:
-            recommended = Tool.query.limit(3).all()
+        # Get recent tools (cached per catalog version) and recommendations
+        # (cached per user and catalog version)
+        recent_tools = get_recent_tools()
+        recommended = get_recommended_tools(user)
         
         return render_template('dashboard.html', 
                              user=user, 
@@ -136,8 +171,10 @@ def create_app():
                     flash('Username already taken!', 'danger')
                     return redirect(url_for('profile'))
             
-            current_user.username = username
-            current_user.email = email
+            # A guest gets its database row here
+            user = persistent_user()
+            user.username = username
+            user.email = email
             db.session.commit()
             flash('Profile updated!', 'success')
             return redirect(url_for('profile'))
@@ -156,11 +193,7 @@ def create_app():
         
         if query:
             # Search tools
-            tools = Tool.query.filter(
-                Tool.name.ilike(f'%{query}%') | 
-                Tool.description.ilike(f'%{query}%') |
-                Tool.category.ilike(f'%{query}%')
-            ).limit(10).all()
+            tools = search_tools(Tool.query, query).limit(10).all()
             results['tools'] = tools
             
             # Search posts
@@ -176,17 +209,40 @@ def create_app():
         
         return render_template('search.html', query=query, results=results)
     
+    @app.route('/livez')
+    def livez():
+        """Liveness probe: the process serves requests (no database)"""
+        return jsonify({'status': 'ok'})
+    
+    @app.route('/readyz')
+    def readyz():
+        """Readiness probe: one pooled SELECT 1"""
+        try:
+            db_ms = ping_database()
+        except Exception as e:
+            app.logger.warning('Readiness check failed: %s', e)
+            return jsonify({'status': 'unavailable', 'error': type(e).__name__}), 503
+        return jsonify({'status': 'ok', 'db_ms': db_ms})
+    
     @app.route('/api/health')
     def health():
         """Health check endpoint"""
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.utcnow().isoformat(),
-            'users': User.query.count(),
-            'tools': Tool.query.count(),
-            'posts': Post.query.count()
+            'startup': app.extensions['startup'],
+            'password_hashing': password_hasher.stats(),
+            'fragment_cache': fragment_cache.stats(),
+            'catalog_snapshot': snapshot_stats()
         })
     
+    @app.route('/api/stats')
+    def site_stats():
+        """Row counts, refreshed in the background"""
+        snapshot = row_counts.snapshot()
+        return jsonify(dict(snapshot['counts'], estimated=snapshot['estimated'],
+                            refreshed_at=snapshot['refreshed_at']))
+    
     # ==================== ERROR HANDLERS ====================
     
     @app.errorhandler(404)
@@ -207,86 +263,40 @@ def create_app():
     @app.context_processor
     def inject_tools_categories():
         """Inject tool categories for navigation"""
-        categories = {}
-        if Tool.query.first():  # Only if database has tools
-            platforms = db.session.query(Tool.platform).distinct().all()
-            for platform in platforms:
-                cats = db.session.query(Tool.category).filter_by(platform=platform[0]).distinct().all()
-                categories[platform[0]] = [cat[0] for cat in cats]
-        return dict(tool_categories=categories)
+        return dict(tool_categories=current_snapshot().taxonomy)
     
     # ==================== INITIAL DATA ====================
     
-    @app.before_first_request
+    initialized = []
+    
+    @app.before_request
     def create_tables_and_seed():
-        """Create tables and seed initial data"""
-        db.create_all()
+        """Create tables and seed the catalog into an empty database (once)"""
+        # Probes must answer without this: /livez never touches the database,
+        # and /readyz reports on it instead of failing inside setup
+        if initialized or request.endpoint in ('livez', 'readyz'):
+            return
+        initialized.append(True)
         
-        # Seed tools if empty
-        if Tool.query.count() == 0:
-            seed_tools()
-            print("✅ Tools database seeded!")
+        # One-off setup; not held against the first request's query budget
+        try:
+            with unbudgeted():
+                db.create_all()
+                ensure_search_index()
+                
+                # Seed tools if empty; real catalogs go through `flask import-tools`
+                seed = app.config.get('SEED_CATALOG')
+                if seed and db.session.query(Tool.id).first() is None:
+                    with open(os.path.join(app.root_path, seed), encoding='utf-8') as f:
+                        import_tools(f, detect_format(seed), log=app.logger.info)
+                    print("✅ Tools database seeded!")
+        except Exception:
+            initialized.clear()  # try again on the next request
+            raise
         
         print("✅ Database initialized!")
     
-    def seed_tools():
-        """Seed initial tools from console prototype"""
-        tools_data = [
-            # Linux - Kali
-            ("Nmap", "Linux", "Information Gathering", "Kali Linux", 
-             "Network discovery and security auditing", "Beginner"),
-            ("Metasploit Framework", "Linux", "Exploitation Tools", "Kali Linux",
-             "Penetration testing platform", "Intermediate"),
-            ("Wireshark", "Linux", "Sniffing & Spoofing", "Kali Linux",
-             "Network protocol analyzer", "Beginner"),
-            ("Burp Suite", "Linux", "Web Application Analysis", "Kali Linux",
-             "Web vulnerability scanner", "Intermediate"),
-            ("John the Ripper", "Linux", "Password Attacks", "Kali Linux",
-             "Password cracker", "Intermediate"),
-            ("Aircrack-ng", "Linux", "Wireless Attacks", "Kali Linux",
-             "WiFi security auditing tools", "Intermediate"),
-            ("Ghidra", "Linux", "Reverse Engineering", "Kali Linux",
-             "Software reverse engineering suite", "Advanced"),
-            ("Autopsy", "Linux", "Forensics", "Kali Linux",
-             "Digital forensics platform", "Intermediate"),
-            
-            # Phone - Android
-            ("JADX", "Phone", "Reverse Engineering", "Android",
-             "Dex to Java decompiler", "Beginner"),
-            ("APKTool", "Phone", "Reverse Engineering", "Android",
-             "Reverse engineering APK files", "Intermediate"),
-            ("MobSF", "Phone", "Forensics", "Android",
-             "Mobile Security Framework", "Intermediate"),
-            
-            # Windows
-            ("IDA Pro", "Windows", "Reverse Engineering", "General",
-             "Interactive disassembler", "Advanced"),
-            ("x64dbg", "Windows", "Reverse Engineering", "General",
-             "Open-source debugger", "Intermediate"),
-            
-            # Web
-            ("Burp Suite Professional", "Web", "Bug Bounty", "General",
-             "Web vulnerability scanner", "Intermediate"),
-            ("OWASP ZAP", "Web", "Bug Bounty", "General",
-             "Web app security scanner", "Beginner"),
-            ("Sublist3r", "Web", "Reconnaissance", "General",
-             "Subdomain enumeration tool", "Beginner"),
-        ]
-        
-        for name, platform, category, subcategory, description, difficulty in tools_data:
-            tool = Tool(
-                name=name,
-                platform=platform,
-                category=category,
-                subcategory=subcategory,
-                description=description,
-                difficulty=difficulty.lower(),
-                is_verified=True
-            )
-            db.session.add(tool)
-        
-        db.session.commit()
-    
+    record_startup(app, _import_ms, create_started)
     return app
 
 # Create the app instance
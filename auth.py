@@ -1,7 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime
 from database import db, User
+from hashing import password_hasher
+from guests import GuestUser
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -19,7 +21,8 @@ def login():
         
         user = User.query.filter_by(username=username).first()
         
-        if user and check_password_hash(user.password_hash, password):
+        # Also rehashes the password if PASSWORD_HASH_METHOD changed
+        if user and password_hasher.verify_and_update(user, password):
             if user.is_active:
                 login_user(user, remember=remember)
                 user.last_login = datetime.utcnow()
@@ -76,7 +79,7 @@ def signup():
                 flash(error, 'danger')
         else:
             # Create new user
-            hashed_password = generate_password_hash(password)
+            hashed_password = password_hasher.hash(password)
             user = User(
                 username=username,
                 email=email,
@@ -97,30 +100,8 @@ def signup():
 @auth_bp.route('/anonymous')
 def anonymous_entry():
     """Anonymous user access"""
-    # Create a temporary anonymous user
-    from datetime import datetime
-    
-    # Generate unique anonymous username
-    import random
-    import string
-    anon_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    username = f'Anonymous_{anon_id}'
-    
-    # Create anonymous user in database
-    user = User(
-        username=username,
-        email=f'{username}@anonymous.hackerhub',
-        password_hash=generate_password_hash('anonymous'),  # Random hash
-        experience='beginner',
-        resources='[]',
-        anonymous=True,
-        is_active=True
-    )
-    
-    db.session.add(user)
-    db.session.commit()
-    
-    login_user(user)
+    # Session-only identity; a User row is created on the first stored action
+    login_user(GuestUser.start())
     flash('Entering as anonymous user. Your data will not be saved permanently.', 'info')
     
     return redirect(url_for('dashboard'))
@@ -130,6 +111,7 @@ def anonymous_entry():
 def logout():
     """User logout"""
     logout_user()
+    session.pop('guest', None)
     flash('Logged out successfully!', 'success')
     return redirect(url_for('index'))
 
@@ -0,0 +1,226 @@
+"""
+In-process tool autocomplete
+Normalized tool names, name aliases and categories live in one sorted
+array; a prefix is a bisect range over it, ranked by precomputed
+popularity weights. Catalog writes are applied incrementally.
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime
+from flask import current_app
+from catalog import on_catalog_change
+from database import db, Tool
+
+ALIAS_FACTOR = 0.8  # an alias hit ranks below the same tool's name hit
+RANGE_SCAN_LIMIT = 1000  # wider prefix ranges walk the by-weight order instead
+MEMO_PREFIX_LENGTH = 2  # short prefixes are asked for constantly, so memoize them
+MEMO_MAX_ENTRIES = 4096  # oldest memoized answers are dropped beyond this
+
+_WORDS = re.compile(r'[^\W_]+')
+
+def normalize(value):
+    """Lowercase, strip accents and collapse punctuation to single spaces"""
+    value = (value or '').lower()
+    if not value.isascii():
+        value = unicodedata.normalize('NFKD', value)
+        value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(_WORDS.findall(value))
+
+def _tool_keys(name):
+    """Primary key plus aliases: later words of the name and the name squashed"""
+    words = normalize(name).split()
+    if not words:
+        return []
+    keys = [(' '.join(words), 1.0)]
+    for i in range(1, len(words)):
+        keys.append((' '.join(words[i:]), ALIAS_FACTOR))
+    if len(words) > 1:
+        keys.append((''.join(words), ALIAS_FACTOR))
+    return keys
+
+def _popularity(downloads, is_verified):
+    return math.log1p(downloads or 0) + (1.0 if is_verified else 0.0)
+
+class PrefixIndex:
+    """Top-N prefix queries over weighted keys.
+
+    Entries are kept twice: sorted by key, so a prefix is a bisect range,
+    and sorted by weight, so a prefix matching a large share of the keys
+    finds its best entries within the first few hundred looked at.
+    """
+
+    def __init__(self):
+        self._by_key = []     # (key, owner, weight)
+        self._by_weight = []  # (-weight, key, owner)
+        self._owned = {}      # owner -> its (key, owner, weight) entries
+        self._payloads = {}   # owner -> suggestion dict
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def add(self, owner, keys, weight, payload):
+        with self._lock:
+            self._remove(owner)
+            entries = [(key, owner, weight * factor) for key, factor in keys]
+            for key, _, entry_weight in entries:
+                insort(self._by_key, (key, owner, entry_weight))
+                insort(self._by_weight, (-entry_weight, key, owner))
+            self._owned[owner] = entries
+            self._payloads[owner] = payload
+            self._memo.clear()
+
+    def remove(self, owner):
+        with self._lock:
+            self._remove(owner)
+            self._memo.clear()
+
+    def _remove(self, owner):
+        for key, _, weight in self._owned.pop(owner, ()):
+            for array, entry in ((self._by_key, (key, owner, weight)),
+                                 (self._by_weight, (-weight, key, owner))):
+                i = bisect_left(array, entry)
+                if i < len(array) and array[i] == entry:
+                    del array[i]
+        self._payloads.pop(owner, None)
+
+    def load(self, items):
+        """Replace the whole index from (owner, keys, weight, payload) items"""
+        by_key, owned, payloads = [], {}, {}
+        for owner, owner_keys, weight, payload in items:
+            entries = [(key, owner, weight * factor) for key, factor in owner_keys]
+            by_key.extend(entries)
+            owned[owner] = entries
+            payloads[owner] = payload
+        by_weight = sorted((-weight, key, owner) for key, owner, weight in by_key)
+        by_key.sort()
+        with self._lock:
+            self._by_key, self._by_weight = by_key, by_weight
+            self._owned, self._payloads = owned, payloads
+            self._memo = {}
+
+    def has(self, owner):
+        return owner in self._owned
+
+    def count(self, kind):
+        return sum(1 for owner in self._owned if owner[0] == kind)
+
+    def complete(self, prefix, limit):
+        if limit < 1:
+            return []
+        memo_key = (prefix, limit)
+        with self._lock:
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            lo = bisect_left(self._by_key, (prefix,))
+            hi = bisect_left(self._by_key, (prefix + '\uffff',))
+            if hi - lo <= RANGE_SCAN_LIMIT:
+                best = {}
+                for _, owner, weight in self._by_key[lo:hi]:
+                    if weight > best.get(owner, -1.0):
+                        best[owner] = weight
+                top = [owner for owner, _ in heapq.nlargest(limit, best.items(), key=lambda item: item[1])]
+            else:
+                # Dense prefix: the heaviest matches turn up early in weight order
+                top, seen = [], set()
+                for _, key, owner in self._by_weight:
+                    if owner not in seen and key.startswith(prefix):
+                        seen.add(owner)
+                        top.append(owner)
+                        if len(top) == limit:
+                            break
+            results = [self._payloads[owner] for owner in top]
+
+            if len(prefix) <= MEMO_PREFIX_LENGTH:
+                if len(self._memo) >= MEMO_MAX_ENTRIES:
+                    del self._memo[next(iter(self._memo))]
+                self._memo[memo_key] = results
+            return results
+
+# ==================== INDEX LIFECYCLE ====================
+
+_index = PrefixIndex()
+_state = {'full': True, 'pending': set(), 'checked_at': 0.0, 'synced_at': None}
+_state_lock = threading.Lock()
+
+@on_catalog_change
+def _mark_changed(tool_ids):
+    with _state_lock:
+        if tool_ids is None:
+            _state['full'] = True
+        else:
+            _state['pending'].update(tool_ids)
+
+def _tool_item(row):
+    tool_id, name, platform, category, downloads, is_verified = row
+    payload = {
+        'type': 'tool',
+        'id': tool_id,
+        'label': name,
+        'platform': platform,
+        'category': category
+    }
+    return ('tool', tool_id), _tool_keys(name), _popularity(downloads, is_verified), payload
+
+def _category_item(category, count):
+    payload = {'type': 'category', 'label': category, 'count': count}
+    return ('category', category), [(normalize(category), 1.0)], math.log1p(count), payload
+
+_TOOL_COLUMNS = (Tool.id, Tool.name, Tool.platform, Tool.category, Tool.downloads, Tool.is_verified)
+
+def _rebuild():
+    """Full rebuild from the database"""
+    items = [_tool_item(row) for row in db.session.query(*_TOOL_COLUMNS)]
+    counts = db.session.query(Tool.category, db.func.count()).group_by(Tool.category)
+    items.extend(_category_item(category, count) for category, count in counts)
+    _index.load(items)
+
+def _apply(tool_ids):
+    """Re-index only the given tools; rows that no longer exist are dropped"""
+    rows = db.session.query(*_TOOL_COLUMNS).filter(Tool.id.in_(tool_ids)).all()
+    found = set()
+    for row in rows:
+        _index.add(*_tool_item(row))
+        found.add(row[0])
+        if not _index.has(('category', row[3])):
+            _index.add(*_category_item(row[3], 1))
+    for tool_id in set(tool_ids) - found:
+        _index.remove(('tool', tool_id))
+
+def _refresh():
+    # Every CATALOG_CACHE_TTL seconds, catch up on writes made by other workers
+    ttl = current_app.config.get('CATALOG_CACHE_TTL', 0)
+    with _state_lock:
+        full = _state['full'] or _state['synced_at'] is None
+        due = bool(ttl) and time.monotonic() - _state['checked_at'] > ttl
+        pending, since = _state['pending'], _state['synced_at']
+        _state['full'], _state['pending'] = False, set()
+        if full or due:
+            _state['checked_at'] = time.monotonic()
+            _state['synced_at'] = datetime.utcnow()
+
+    if full:
+        _rebuild()
+        return
+
+    if due:
+        changed = db.session.query(Tool.id).filter(Tool.updated_at >= since)
+        pending.update(row[0] for row in changed)
+    if pending:
+        _apply(pending)
+    if due and db.session.query(db.func.count(Tool.id)).scalar() != _index.count('tool'):
+        # Rows were deleted elsewhere; only a rebuild notices those
+        _rebuild()
+
+def complete(prefix, limit=8):
+    """Top `limit` tool and category suggestions for a typed prefix"""
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    _refresh()
+    return _index.complete(prefix, limit)
@@ -0,0 +1,7 @@
+"""
+Hacker Hub load benchmarks
+
+    python -m bench generate --database-url sqlite:///bench.db --tools 10000
+    python -m bench run --database-url sqlite:///bench.db --requests 2000 -o before.json
+    python -m bench compare before.json after.json
+"""
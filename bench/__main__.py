@@ -0,0 +1,123 @@
+"""
+Benchmark command line: generate, run, compare
+"""
+
+import argparse
+import json
+import sys
+from sqlalchemy import func
+from app import create_app
+from config import Config
+from database import db, User, Tool, Post
+from bench import datagen
+from bench.report import build_report, compare
+from bench.workload import DEFAULT_MIX, Workload, parse_mix, run_http, run_in_process
+
+def _app(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        PROPAGATE_EXCEPTIONS = False
+    return create_app(BenchConfig)
+
+def cmd_generate(args):
+    app = _app(args.database_url)
+    with app.app_context():
+        counts = datagen.generate(
+            tools=args.tools, users=args.users, follows=args.follows, posts=args.posts,
+            comments_per_post=args.comments_per_post, comment_depth=args.comment_depth,
+            seed=args.seed, batch_size=args.batch_size,
+            log=lambda message: print(message, file=sys.stderr))
+    print(json.dumps(counts, indent=2))
+
+def cmd_run(args):
+    app = _app(args.database_url)
+    with app.app_context():
+        scale = {
+            'users': db.session.query(func.max(User.id)).scalar() or 0,
+            'tools': db.session.query(func.max(Tool.id)).scalar() or 0,
+            'posts': db.session.query(func.max(Post.id)).scalar() or 0,
+        }
+        database = db.engine.url.render_as_string(hide_password=True)
+    if not all(scale.values()):
+        sys.exit('Database is empty; run `python -m bench generate` first.')
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    workload = Workload(mix, scale, seed=args.seed)
+
+    if args.url:
+        samples, wall = run_http(args.url, app, workload, args.requests, args.warmup,
+                                 scale['users'], concurrency=args.concurrency, seed=args.seed)
+    else:
+        samples, wall = run_in_process(app, workload, args.requests, args.warmup,
+                                       scale['users'], seed=args.seed)
+
+    report = build_report(samples, wall, {
+        'driver': 'http' if args.url else 'test-client',
+        'url': args.url,
+        'database': database,
+        'scale': scale,
+        'mix': {name: weight for name, (weight, _) in mix.items()},
+        'requests': args.requests,
+        'warmup': args.warmup,
+        'concurrency': args.concurrency if args.url else 1,
+        'seed': args.seed,
+    })
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f'Report written to {args.output}', file=sys.stderr)
+    else:
+        print(output)
+
+def cmd_compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f'{"scope":<14} {"metric":<16} {"before":>10} {"after":>10} {"change":>8}')
+    for scope, metric, a, b, change in compare(before, after):
+        change = f'{change:+.1f}%' if change is not None else '-'
+        print(f'{scope:<14} {metric:<16} {a if a is not None else "-":>10} '
+              f'{b if b is not None else "-":>10} {change:>8}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Hacker Hub load benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='create a synthetic dataset (drops existing tables)')
+    generate.add_argument('--database-url', required=True)
+    generate.add_argument('--tools', type=int, default=10000)
+    generate.add_argument('--users', type=int, default=1000)
+    generate.add_argument('--follows', type=int, default=100000)
+    generate.add_argument('--posts', type=int, default=2000)
+    generate.add_argument('--comments-per-post', type=int, default=20)
+    generate.add_argument('--comment-depth', type=int, default=6)
+    generate.add_argument('--batch-size', type=int, default=5000)
+    generate.add_argument('--seed', type=int, default=42)
+    generate.set_defaults(func=cmd_generate)
+
+    run = commands.add_parser('run', help='replay the route mix and report latency')
+    run.add_argument('--database-url', required=True,
+                     help='dataset to read ids from (and to serve, for the test-client driver)')
+    run.add_argument('--url', help='benchmark a running server instead, e.g. http://127.0.0.1:8000')
+    run.add_argument('--requests', type=int, default=2000)
+    run.add_argument('--warmup', type=int, default=100)
+    run.add_argument('--concurrency', type=int, default=4, help='client threads for --url')
+    run.add_argument('--mix', help='route weights, e.g. tools_list=30,dashboard=10')
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('-o', '--output', help='write the JSON report here')
+    run.set_defaults(func=cmd_run)
+
+    diff = commands.add_parser('compare', help='diff two JSON reports')
+    diff.add_argument('before')
+    diff.add_argument('after')
+    diff.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Synthetic dataset generator
+Fills an empty database with a reproducible catalog, users, follows and
+posts with nested comment threads, using batched executemany inserts.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from database import db, User, Tool, UserTool, Post, Comment
+from search import ensure_search_index
+
+PLATFORMS = {
+    'Linux': ['Kali Linux', 'Ubuntu', 'Termux'],
+    'Windows': ['General'],
+    'Phone': ['Android', 'iOS'],
+    'Web': ['General'],
+}
+CATEGORIES = [
+    'Information Gathering', 'Vulnerability Analysis', 'Web Application Analysis',
+    'Password Attacks', 'Wireless Attacks', 'Reverse Engineering', 'Exploitation Tools',
+    'Post Exploitation', 'Forensics', 'Sniffing & Spoofing', 'Bug Bounty', 'Reconnaissance',
+]
+WORDS = [
+    'net', 'scan', 'map', 'sploit', 'burp', 'hash', 'crack', 'sniff', 'fuzz', 'dump',
+    'recon', 'shell', 'proxy', 'trace', 'hunt', 'forge', 'vault', 'ghost', 'spider', 'wire',
+]
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+EXPERIENCES = ['beginner', 'intermediate', 'advanced', 'elite']
+POST_TYPES = ['discussion', 'tutorial', 'news', 'question']
+
+# Searches the workload issues; all match generated tool text
+SEARCH_TERMS = WORDS + [c.split()[0].lower() for c in CATEGORIES]
+
+def _insert(table, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[start:start + batch_size])
+        db.session.commit()
+
+def generate(tools=10000, users=1000, follows=100000, posts=2000,
+             comments_per_post=20, comment_depth=6, seed=42, batch_size=5000, log=print):
+    """Drop and recreate every table, then fill them. Returns row counts."""
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+    started = time.perf_counter()
+
+    db.drop_all()
+    db.create_all()
+
+    user_rows = [{
+        'id': i,
+        'username': f'bench_user_{i}',
+        'email': f'bench_user_{i}@bench.hackerhub',
+        'password_hash': '!',  # not a valid hash: bench users cannot log in
+        'experience': rng.choice(EXPERIENCES),
+        'resources': '["PC/Laptop", "Hacking Lab"]',
+        'anonymous': False,
+        'is_active': True,
+        'created_at': now - timedelta(days=rng.randint(0, 700)),
+    } for i in range(1, users + 1)]
+    _insert(User.__table__, user_rows, batch_size)
+    log(f'users: {users}')
+
+    tool_rows = []
+    for i in range(1, tools + 1):
+        platform = rng.choice(list(PLATFORMS))
+        name = ''.join(w.capitalize() for w in rng.sample(WORDS, 2))
+        category = rng.choice(CATEGORIES)
+        tool_rows.append({
+            'id': i,
+            'name': f'{name} {i}',
+            'platform': platform,
+            'category': category,
+            'subcategory': rng.choice(PLATFORMS[platform]),
+            'description': f'{category} tool that can {" and ".join(rng.sample(WORDS, 3))} targets',
+            'difficulty': rng.choice(DIFFICULTIES),
+            'command': '',
+            'downloads': int(rng.paretovariate(1.2)) - 1,
+            'is_verified': rng.random() < 0.8,
+            'created_at': now - timedelta(minutes=rng.randint(0, 500000)),
+            'updated_at': now,
+        })
+    _insert(Tool.__table__, tool_rows, batch_size)
+    del tool_rows
+    log(f'tools: {tools}')
+
+    follows = min(follows, users * tools)
+    follow_rows = []
+    per_user, extra = divmod(follows, users)
+    for user_id in range(1, users + 1):
+        count = min(per_user + (1 if user_id <= extra else 0), tools)
+        for tool_id in rng.sample(range(1, tools + 1), count):
+            follow_rows.append({
+                'user_id': user_id,
+                'tool_id': tool_id,
+                'skill_level': 'beginner',
+                'followed_at': now,
+            })
+        if len(follow_rows) >= batch_size:
+            _insert(UserTool.__table__, follow_rows, batch_size)
+            follow_rows = []
+    _insert(UserTool.__table__, follow_rows, batch_size)
+    log(f'follows: {follows}')
+
+    post_rows, comment_rows = [], []
+    comment_id = 0
+    for post_id in range(1, posts + 1):
+        created = now - timedelta(minutes=rng.randint(0, 500000))
+        post_rows.append({
+            'id': post_id,
+            'title': f'Post {post_id} about {rng.choice(WORDS)}',
+            'content': 'Synthetic benchmark post. ' * 10,
+            'post_type': rng.choice(POST_TYPES),
+            'user_id': rng.randint(1, users),
+            'tool_id': rng.randint(1, tools) if tools else None,
+            'upvotes': rng.randint(0, 50),
+            'downvotes': rng.randint(0, 5),
+            'views': rng.randint(0, 5000),
+            'is_pinned': rng.random() < 0.01,
+            'is_locked': rng.random() < 0.02,
+            'created_at': created,
+            'updated_at': created,
+        })
+
+        # Each comment replies to a random earlier one, or starts a new branch
+        thread, depths = [], {}
+        for n in range(comments_per_post):
+            comment_id += 1
+            parent = None
+            if thread and rng.random() < 0.7:
+                parent = rng.choice(thread)
+                if depths[parent] >= comment_depth:
+                    parent = None
+            depths[comment_id] = depths[parent] + 1 if parent else 0
+            thread.append(comment_id)
+            comment_rows.append({
+                'id': comment_id,
+                'content': f'Comment {n} on post {post_id}',
+                'user_id': rng.randint(1, users),
+                'post_id': post_id,
+                'parent_id': parent,
+                'upvotes': 0,
+                'downvotes': 0,
+                'created_at': created + timedelta(minutes=n),
+            })
+        if len(comment_rows) >= batch_size:
+            _insert(Post.__table__, post_rows, batch_size)
+            _insert(Comment.__table__, comment_rows, batch_size)
+            post_rows, comment_rows = [], []
+    _insert(Post.__table__, post_rows, batch_size)
+    _insert(Comment.__table__, comment_rows, batch_size)
+    log(f'posts: {posts}, comments: {comment_id}')
+
+    ensure_search_index(rebuild=True)
+    log(f'done in {time.perf_counter() - started:.1f}s')
+
+    return {
+        'users': users,
+        'tools': tools,
+        'follows': follows,
+        'posts': posts,
+        'comments': comment_id,
+    }
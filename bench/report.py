@@ -0,0 +1,77 @@
+"""
+Benchmark report
+Per-route and overall latency percentiles, throughput and SQL statements
+per request, as JSON that can be diffed between commits.
+"""
+
+import math
+import subprocess
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def _summarize(samples, wall_seconds=None):
+    latencies = sorted(s['seconds'] * 1000 for s in samples)
+    queries = sorted(s['queries'] for s in samples if s['queries'] is not None)
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample['status'])] = statuses.get(str(sample['status']), 0) + 1
+
+    summary = {
+        'requests': len(samples),
+        'p50_ms': _round(percentile(latencies, 50)),
+        'p95_ms': _round(percentile(latencies, 95)),
+        'p99_ms': _round(percentile(latencies, 99)),
+        'mean_ms': _round(sum(latencies) / len(latencies)) if latencies else None,
+        'sql_per_request': _round(sum(queries) / len(queries)) if queries else None,
+        'sql_p95': percentile(queries, 95),
+        'bytes_mean': _round(sum(s['bytes'] for s in samples) / len(samples)) if samples else None,
+        'statuses': statuses,
+    }
+    if wall_seconds:
+        summary['throughput_rps'] = _round(len(samples) / wall_seconds)
+    return summary
+
+def _round(value):
+    return None if value is None else round(value, 3)
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_report(samples, wall_seconds, meta):
+    by_route = {}
+    for sample in samples:
+        by_route.setdefault(sample['route'], []).append(sample)
+
+    return {
+        'meta': dict(meta, revision=git_revision()),
+        'overall': _summarize(samples, wall_seconds),
+        'routes': {route: _summarize(route_samples)
+                   for route, route_samples in sorted(by_route.items())},
+    }
+
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms', 'sql_per_request', 'throughput_rps')
+
+def compare(before, after):
+    """Rows of (scope, metric, before, after, change %) for two reports"""
+    rows = []
+    scopes = [('overall', before['overall'], after['overall'])]
+    for route in sorted(set(before['routes']) | set(after['routes'])):
+        scopes.append((route, before['routes'].get(route, {}), after['routes'].get(route, {})))
+
+    for scope, old, new in scopes:
+        for metric in COMPARED:
+            a, b = old.get(metric), new.get(metric)
+            if a is None and b is None:
+                continue
+            change = round((b - a) / a * 100, 1) if a and b is not None else None
+            rows.append((scope, metric, a, b, change))
+    return rows
@@ -0,0 +1,180 @@
+"""
+Weighted route mix and request drivers
+The in-process driver goes through the Flask test client and counts SQL
+statements per request; the HTTP driver replays the same mix against a
+running server (e.g. local gunicorn) from several threads.
+"""
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from sqlalchemy import event
+from database import db
+from bench.datagen import PLATFORMS, SEARCH_TERMS
+
+# name -> (weight, needs login)
+DEFAULT_MIX = {
+    'tools_list': (30, False),
+    'tool_detail': (25, False),
+    'api_search': (20, False),
+    'dashboard': (10, True),
+    'community': (10, False),
+    'post_detail': (5, False),
+}
+
+def parse_mix(spec):
+    """'tools_list=30,dashboard=10' -> mix dict (unknown names rejected)"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'unknown route {name!r}; choose from {", ".join(DEFAULT_MIX)}')
+        mix[name] = (float(weight or 1), DEFAULT_MIX[name][1])
+    return mix
+
+class Workload:
+    """Draws (route name, path, needs login) from a weighted mix"""
+
+    def __init__(self, mix, scale, seed=1):
+        self.rng = random.Random(seed)
+        self.names = list(mix)
+        self.weights = [mix[name][0] for name in self.names]
+        self.auth = {name: mix[name][1] for name in self.names}
+        self.scale = scale
+
+    def _path(self, name):
+        rng, scale = self.rng, self.scale
+        if name == 'tools_list':
+            roll = rng.random()
+            if roll < 0.5:
+                return '/tools'
+            if roll < 0.8:
+                return f'/tools?platform={quote(rng.choice(list(PLATFORMS)))}'
+            return f'/tools?search={quote(rng.choice(SEARCH_TERMS))}'
+        if name == 'tool_detail':
+            return f'/tools/{rng.randint(1, scale["tools"])}'
+        if name == 'api_search':
+            term = rng.choice(SEARCH_TERMS)
+            return f'/api/tools/search?q={quote(term[:rng.randint(2, len(term))])}'
+        if name == 'dashboard':
+            return '/dashboard'
+        if name == 'community':
+            return '/community'
+        if name == 'post_detail':
+            return f'/community/post/{rng.randint(1, scale["posts"])}'
+        raise ValueError(name)
+
+    def next(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        return name, self._path(name), self.auth[name]
+
+class QueryCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def _login_cookie(app, user_id):
+    """A signed Flask session cookie logged in as user_id"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.dumps({'_user_id': str(user_id), '_fresh': True})
+
+def run_in_process(app, workload, requests, warmup, users, seed=1):
+    """Replay the mix through the test client; returns (samples, wall seconds)"""
+    rng = random.Random(seed)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    anonymous = app.test_client()
+    member = app.test_client()
+    cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+    member.set_cookie(cookie_name, _login_cookie(app, rng.randint(1, users)))
+
+    samples = []
+    started = None
+    for i in range(warmup + requests):
+        if i == warmup:
+            started = time.perf_counter()
+        name, path, needs_login = workload.next()
+        client = member if needs_login else anonymous
+
+        before = counter.count
+        t0 = time.perf_counter()
+        try:
+            response = client.get(path)
+            status, body = response.status_code, response.get_data()
+        except Exception:
+            # An error page that itself fails escapes the app; count it as a 500
+            status, body = 500, b''
+        elapsed = time.perf_counter() - t0
+
+        if i >= warmup:
+            samples.append({
+                'route': name,
+                'seconds': elapsed,
+                'status': status,
+                'queries': counter.count - before,
+                'bytes': len(body),
+            })
+    return samples, time.perf_counter() - (started or time.perf_counter())
+
+def run_http(base_url, app, workload, requests, warmup, users, concurrency=4, seed=1):
+    """Replay the mix against a live server; SQL counts are not observable here"""
+    rng = random.Random(seed)
+    cookie_name = app.config.get('SESSION_COOKIE_NAME', 'session')
+    cookie = f'{cookie_name}={_login_cookie(app, rng.randint(1, users))}'
+    base_url = base_url.rstrip('/')
+
+    def fetch(path, needs_login):
+        request = urllib.request.Request(base_url + path)
+        if needs_login:
+            request.add_header('Cookie', cookie)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+        except OSError:
+            return 0, b''
+
+    for _ in range(warmup):
+        _, path, needs_login = workload.next()
+        fetch(path, needs_login)
+
+    plan = [workload.next() for _ in range(requests)]
+    lock = threading.Lock()
+    samples = []
+
+    def worker():
+        while True:
+            with lock:
+                if not plan:
+                    return
+                name, path, needs_login = plan.pop()
+            t0 = time.perf_counter()
+            status, body = fetch(path, needs_login)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                samples.append({
+                    'route': name,
+                    'seconds': elapsed,
+                    'status': status,
+                    'queries': None,
+                    'bytes': len(body),
+                })
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
@@ -0,0 +1,114 @@
+"""
+Catalog versioning and in-process caches
+Any committed write to a Tool row bumps the catalog version, which
+invalidates every cache built on top of it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import Tool
+
+_version = 0
+_version_lock = threading.Lock()
+_listeners = []
+
+def catalog_version():
+    """Current in-process catalog version"""
+    return _version
+
+def bump_catalog_version(tool_ids=None):
+    """Invalidate everything derived from the catalog.
+
+    tool_ids, when known, are the rows that changed; None means any row may have.
+    """
+    global _version
+    with _version_lock:
+        _version += 1
+    for callback in _listeners:
+        callback(tool_ids)
+    return _version
+
+def on_catalog_change(callback):
+    """Register callback(tool_ids) to run after each catalog version bump"""
+    _listeners.append(callback)
+    return callback
+
+# ==================== WRITE TRACKING ====================
+
+@event.listens_for(Session, 'after_flush')
+def _track_tool_writes(session, flush_context):
+    """Remember which Tool rows this transaction wrote (ids are assigned by now)"""
+    changed = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Tool):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Tool) and session.is_modified(obj):
+            changed.add(obj.id)
+    if changed:
+        session.info.setdefault('catalog_changed', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    changed = session.info.pop('catalog_changed', None)
+    if changed:
+        bump_catalog_version(changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('catalog_changed', None)
+
+# ==================== CACHES ====================
+
+def tool_summary(tool):
+    """Plain data for tool cards and listings, safe to keep across sessions"""
+    return {
+        'id': tool.id,
+        'name': tool.name,
+        'platform': tool.platform,
+        'category': tool.category,
+        'difficulty': tool.difficulty,
+        'description': tool.description
+    }
+
+class VersionedCache:
+    """Values rebuilt lazily, per argument tuple, when the catalog version changes.
+
+    maxsize caps the number of argument tuples kept, least recently used
+    first out.
+    """
+
+    def __init__(self, builder, maxsize=None):
+        self._builder = builder
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # args -> (version, built_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, *args):
+        # Other workers' writes are only seen after CATALOG_CACHE_TTL seconds
+        ttl = current_app.config.get('CATALOG_CACHE_TTL', 0)
+        entry = self._entries.get(args)
+        if entry is not None and entry[0] == _version:
+            if not ttl or time.monotonic() - entry[1] < ttl:
+                if self.maxsize is not None:
+                    with self._lock:
+                        if args in self._entries:
+                            self._entries.move_to_end(args)
+                return entry[2]
+
+        version = _version
+        value = self._builder(*args)
+        with self._lock:
+            self._entries[args] = (version, time.monotonic(), value)
+            self._entries.move_to_end(args)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
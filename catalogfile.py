@@ -0,0 +1,132 @@
+"""
+Compact catalog file
+Tools are stored column by column: every distinct string once in a string
+table, and each column as an array of uint32 string ids. Opening a file
+maps it into memory and reads only the header; strings are decoded, and
+interned, the first time they are used.
+
+    python catalogfile.py data/tools.jsonl data/tools.cat
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'HHCAT1\n'
+COLUMNS = ('name', 'platform', 'category', 'subcategory', 'description', 'difficulty')
+
+def _ids(values):
+    a = array('I', values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+def encode_catalog(records, columns=COLUMNS):
+    """Bytes of a catalog file for an iterable of mappings with the given keys"""
+    strings = {}
+    names = tuple(columns)
+    columns = {column: array('I') for column in names}
+    count = 0
+    for record in records:
+        for column in names:
+            value = str(record.get(column) or '')
+            columns[column].append(strings.setdefault(value, len(strings)))
+        count += 1
+
+    blob = bytearray()
+    offsets = [0]
+    for value in strings:  # dicts keep insertion order, which is id order
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+
+    header = json.dumps({'count': count, 'strings': len(strings), 'columns': names}).encode()
+    header += b' ' * (-(len(MAGIC) + 4 + len(header)) % 4)  # keep the arrays 4-byte aligned
+    parts = [MAGIC, struct.pack('<I', len(header)), header, _ids(offsets)]
+    parts.extend(_ids(columns[column]) for column in names)
+    parts.append(bytes(blob))
+    return b''.join(parts)
+
+def write_catalog(records, path):
+    """Write a catalog file atomically"""
+    data = encode_catalog(records)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class CatalogFile:
+    """Read-only view of a catalog file (or its bytes)"""
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray)):
+            self._buffer = memoryview(bytes(source))
+        else:
+            with open(source, 'rb') as f:
+                self._buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+        if bytes(self._buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError('not a catalog file')
+        position = len(MAGIC)
+        header_length, = struct.unpack_from('<I', self._buffer, position)
+        position += 4
+        header = json.loads(bytes(self._buffer[position:position + header_length]))
+        position += header_length
+
+        self.count = header['count']
+        self.columns = tuple(header['columns'])
+        self._offsets, position = self._array(position, header['strings'] + 1)
+        self._ids = {}
+        for column in self.columns:
+            self._ids[column], position = self._array(position, self.count)
+        self._blob = self._buffer[position:]
+        self._strings = [None] * header['strings']
+
+    def _array(self, position, length):
+        end = position + 4 * length
+        view = self._buffer[position:end]
+        if sys.byteorder == 'little':
+            return view.cast('I'), end
+        values = array('I', view.tobytes())
+        values.byteswap()
+        return values, end
+
+    def __len__(self):
+        return self.count
+
+    def ids(self, column):
+        """String ids of a column, one per tool"""
+        return self._ids[column]
+
+    def string(self, string_id):
+        value = self._strings[string_id]
+        if value is None:
+            start, end = self._offsets[string_id], self._offsets[string_id + 1]
+            value = self._strings[string_id] = sys.intern(str(self._blob[start:end], 'utf-8'))
+        return value
+
+    def value(self, column, index):
+        return self.string(self._ids[column][index])
+
+    def record(self, index):
+        return {column: self.value(column, index) for column in self.columns}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit('usage: python catalogfile.py SOURCE.jsonl TARGET.cat')
+    source, target = argv
+    write_catalog(read_jsonl(source), target)
+    catalog = CatalogFile(target)
+    print(f'{target}: {len(catalog)} tools, {os.path.getsize(target)} bytes')
+
+if __name__ == '__main__':
+    main()
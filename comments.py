@@ -0,0 +1,74 @@
+"""
+Comment thread loading
+A whole thread is fetched with one recursive CTE, bounded in depth and in
+replies per parent, and assembled in memory instead of one lazy `replies`
+query per comment.
+"""
+
+from flask import current_app
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from database import db, Comment
+
+def load_comment_tree(post_id, max_depth=None, max_siblings=None):
+    """Return (top-level comments, number of hidden top-level comments).
+
+    Each loaded comment gets its `replies` populated without further
+    queries, plus `depth` and `hidden_replies` attributes. At most
+    max_siblings replies are loaded per parent, oldest first, and none
+    below max_depth; hidden_replies counts the replies left out, so a
+    comment at max_depth with replies still shows that it has them.
+    """
+    if max_depth is None:
+        max_depth = current_app.config.get('COMMENT_MAX_DEPTH', 6)
+    if max_siblings is None:
+        max_siblings = current_app.config.get('COMMENT_MAX_SIBLINGS', 50)
+
+    # Rank siblings once, so the recursion only ever follows the first
+    # max_siblings of each parent and the result stays bounded
+    ranked = (select(Comment.id.label('id'), Comment.parent_id.label('parent_id'),
+                     func.row_number().over(partition_by=Comment.parent_id,
+                                            order_by=(Comment.created_at, Comment.id)).label('rn'),
+                     func.count().over(partition_by=Comment.parent_id).label('siblings'))
+              .where(Comment.post_id == post_id)
+              .cte('ranked'))
+    thread = (select(ranked.c.id, ranked.c.siblings, literal(0).label('depth'))
+              .where(ranked.c.parent_id.is_(None), ranked.c.rn <= max_siblings)
+              .cte('thread', recursive=True))
+    reply = aliased(ranked)
+    thread = thread.union_all(
+        select(reply.c.id, reply.c.siblings, thread.c.depth + 1)
+        .join(thread, reply.c.parent_id == thread.c.id)
+        .where(reply.c.rn <= max_siblings, thread.c.depth < max_depth)
+    )
+    reply_counts = (select(ranked.c.parent_id.label('parent_id'), func.count().label('replies'))
+                    .where(ranked.c.parent_id.is_not(None))
+                    .group_by(ranked.c.parent_id)
+                    .subquery())
+
+    rows = (db.session.query(Comment, thread.c.depth, thread.c.siblings,
+                             func.coalesce(reply_counts.c.replies, 0))
+            .join(thread, Comment.id == thread.c.id)
+            .outerjoin(reply_counts, reply_counts.c.parent_id == Comment.id)
+            .options(joinedload(Comment.author))
+            .order_by(Comment.created_at, Comment.id)
+            .all())
+
+    roots = []
+    root_count = 0
+    children = {}
+    for comment, depth, siblings, _ in rows:
+        comment.depth = depth
+        if comment.parent_id is None:
+            roots.append(comment)
+            root_count = siblings
+        else:
+            children.setdefault(comment.parent_id, []).append(comment)
+
+    for comment, _, _, reply_count in rows:
+        replies = children.get(comment.id, [])
+        set_committed_value(comment, 'replies', replies)
+        comment.hidden_replies = reply_count - len(replies)
+
+    return roots, root_count - len(roots)
@@ -1,40 +1,84 @@
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, current_app
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, selectinload
+from guests import persistent_user
+from conditional import conditional
 from database import db, Post, Comment, CTFChallenge
 from datetime import datetime
+from counters import hit_counter
+from pagination import paginate_keyset
+from comments import load_comment_tree
 
 community_bp = Blueprint('community', __name__)
 
+# Seek key for post listings: newest first, id to break ties
+POST_ORDER = [(Post.created_at, True), (Post.id, True)]
+
 @community_bp.route('/community')
 def community_home():
     """Community forum homepage"""
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     post_type = request.args.get('type', 'all')
     
-    query = Post.query.filter_by(is_locked=False)
+    # Authors are loaded with one IN query per list instead of one per post
+    query = Post.query.filter_by(is_locked=False).options(selectinload(Post.author))
     
     if post_type != 'all':
         query = query.filter_by(post_type=post_type)
     
     # Get pinned posts first
-    pinned_posts = Post.query.filter_by(is_pinned=True).order_by(Post.created_at.desc()).all()
+    pinned_posts = (Post.query.filter_by(is_pinned=True)
+                    .options(selectinload(Post.author))
+                    .order_by(Post.created_at.desc())
+                    .all())
     
-    # Get regular posts
-    posts = query.order_by(Post.created_at.desc()).paginate(page=page, per_page=10, error_out=False)
+    # Get regular posts, newest first
+    posts = paginate_keyset(query, POST_ORDER, cursor, per_page=10,
+                            count_ttl=current_app.config.get('PAGINATION_COUNT_TTL'))
     
     return render_template('community.html',
                          posts=posts,
                          pinned_posts=pinned_posts,
                          post_type=post_type)
 
+@community_bp.route('/api/community/posts')
+@conditional('posts', personalized=False)
+def api_posts():
+    """API endpoint for the post feed, cursor-paginated"""
+    post_type = request.args.get('type', 'all')
+    
+    query = Post.query.filter_by(is_locked=False)
+    if post_type != 'all':
+        query = query.filter_by(post_type=post_type)
+    
+    posts = paginate_keyset(query, POST_ORDER, request.args.get('cursor'), per_page=10)
+    
+    return jsonify({
+        'items': [{
+            'id': post.id,
+            'title': post.title,
+            'post_type': post.post_type,
+            'upvotes': post.upvotes,
+            'created_at': post.created_at.isoformat()
+        } for post in posts.items],
+        'next_cursor': posts.next_cursor,
+        'prev_cursor': posts.prev_cursor
+    })
+
 @community_bp.route('/community/post/<int:post_id>')
 def view_post(post_id):
     """View individual post"""
-    post = Post.query.get_or_404(post_id)
-    post.views += 1  # Track views
-    db.session.commit()
+    post = Post.query.options(joinedload(Post.author)).get_or_404(post_id)
+    hit_counter.increment(Post.views, post.id)  # Track views
+    hit_counter.apply_pending(post, Post.views)
+    
+    # Whole thread in one query, bounded in depth and siblings
+    comments, hidden_comments = load_comment_tree(post.id)
     
-    return render_template('post_detail.html', post=post)
+    return render_template('post_detail.html',
+                         post=post,
+                         comments=comments,
+                         hidden_comments=hidden_comments)
 
 @community_bp.route('/community/new', methods=['GET', 'POST'])
 @login_required
@@ -53,7 +97,7 @@ def new_post():
             title=title,
             content=content,
             post_type=post_type,
-            user_id=current_user.id
+            user_id=persistent_user().id
         )
         
         db.session.add(post)
@@ -77,7 +121,7 @@ def add_comment(post_id):
     
     comment = Comment(
         content=content,
-        user_id=current_user.id,
+        user_id=persistent_user().id,
         post_id=post_id,
         parent_id=parent_id if parent_id else None
     )
@@ -89,6 +133,7 @@ def add_comment(post_id):
     return redirect(url_for('community.view_post', post_id=post_id))
 
 @community_bp.route('/ctf')
+@conditional('ctf')
 def ctf_challenges():
     """CTF challenges list"""
     challenges = CTFChallenge.query.filter_by(is_active=True).order_by(CTFChallenge.difficulty).all()
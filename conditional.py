@@ -0,0 +1,173 @@
+"""
+Conditional GET responses
+Every write to a Tool, Post or CTFChallenge bumps a row in content_versions
+inside the same transaction. Read endpoints derive strong ETags and
+Last-Modified from those rows, answer 304 when the client is current, and
+send Cache-Control so browsers and the edge can reuse the response.
+"""
+
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+from flask import current_app, g, has_app_context, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import db, Tool, Post, CTFChallenge, ContentVersion
+
+KINDS = {Tool: 'tools', Post: 'posts', CTFChallenge: 'ctf'}
+
+class _VersionCache:
+    """The last content_versions read of one app"""
+
+    def __init__(self):
+        self.loaded = None  # (loaded_at, {name: (version, updated_at)})
+
+def _version_cache():
+    # Per app, so apps on different databases in one process never share versions
+    extensions = current_app.extensions
+    cache = extensions.get('content_versions')
+    if cache is None:
+        cache = extensions.setdefault('content_versions', _VersionCache())
+    return cache
+
+def content_versions():
+    """{kind: (version, updated_at)}, re-read at most every CONTENT_VERSION_TTL seconds"""
+    cache = _version_cache()
+    ttl = current_app.config.get('CONTENT_VERSION_TTL', 2)
+    loaded = cache.loaded
+    if loaded is not None and time.monotonic() - loaded[0] < ttl:
+        return loaded[1]
+
+    rows = db.session.execute(
+        select(ContentVersion.name, ContentVersion.version, ContentVersion.updated_at)).all()
+    versions = {name: (version, updated_at) for name, version, updated_at in rows}
+    cache.loaded = (time.monotonic(), versions)
+    return versions
+
+def forget_content_versions():
+    if has_app_context():
+        _version_cache().loaded = None
+
+def bump_content_version(connection, *kinds):
+    """Increment the given kinds' versions on connection (in its transaction)"""
+    now = datetime.utcnow()
+    table = ContentVersion.__table__
+    for kind in kinds:
+        result = connection.execute(update(table).where(table.c.name == kind)
+                                    .values(version=table.c.version + 1, updated_at=now))
+        if result.rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(table).values(name=kind, version=1, updated_at=now))
+        except IntegrityError:
+            # Another transaction created the row first
+            connection.execute(update(table).where(table.c.name == kind)
+                               .values(version=table.c.version + 1, updated_at=now))
+
+def bump_content_version_now(*kinds):
+    """Bump outside the ORM unit of work, e.g. after bulk writes"""
+    with db.engine.begin() as connection:
+        bump_content_version(connection, *kinds)
+    forget_content_versions()
+
+# ==================== WRITE TRACKING ====================
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session, flush_context):
+    kinds = set()
+    for obj in list(session.new) + list(session.deleted):
+        kind = KINDS.get(type(obj))
+        if kind:
+            kinds.add(kind)
+    for obj in session.dirty:
+        kind = KINDS.get(type(obj))
+        if kind and session.is_modified(obj):
+            kinds.add(kind)
+    kinds -= session.info.get('content_bumped', set())
+    if kinds:
+        bump_content_version(session.connection(), *sorted(kinds))
+        session.info.setdefault('content_bumped', set()).update(kinds)
+
+@event.listens_for(Session, 'after_commit')
+def _forget_on_commit(session):
+    # This process sees its own writes at once; others within CONTENT_VERSION_TTL
+    if session.info.pop('content_bumped', None):
+        forget_content_versions()
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('content_bumped', None)
+
+# ==================== RESPONSES ====================
+
+def _cache_control(response, public):
+    config = current_app.config
+    if public:
+        response.cache_control.public = True
+        response.cache_control.max_age = config.get('HTTP_CACHE_MAX_AGE', 0)
+        shared = config.get('HTTP_CACHE_SHARED_MAX_AGE')
+        if shared:
+            response.cache_control.s_maxage = shared
+    else:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+def conditional(*kinds, personalized=True, rotate=None):
+    """Serve a GET view with ETag / Last-Modified and 304s.
+
+    The validator covers the kinds' versions, the full URL and the release.
+    personalized views only get validators for anonymous visitors; signed-in
+    users get `private, no-cache`. rotate (seconds) adds a time bucket, for
+    views that vary on a schedule; the bucket is available as g.content_etag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if personalized and (current_user.is_authenticated or '_flashes' in session):
+                response = make_response(view(*args, **kwargs))
+                _cache_control(response, public=False)
+                return response
+
+            versions = content_versions()
+            parts = [current_app.config.get('RELEASE', ''), request.full_path]
+            last_modified = None
+            for kind in kinds:
+                version, updated_at = versions.get(kind, (0, None))
+                parts.append(f'{kind}={version}')
+                if updated_at and (last_modified is None or updated_at > last_modified):
+                    last_modified = updated_at
+            if rotate:
+                parts.append(str(int(time.time() // rotate)))
+            etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0)
+            g.content_etag = etag
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (last_modified is not None and not rotate
+                                and request.if_modified_since is not None
+                                and request.if_modified_since.replace(tzinfo=None) >= last_modified)
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or session.modified:
+                    # Errors and responses that set a cookie are not shared
+                    _cache_control(response, public=False)
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            _cache_control(response, public=True)
+            if personalized:
+                response.vary.add('Cookie')
+            return response
+        return wrapper
+    return decorator
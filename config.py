@@ -21,7 +21,51 @@ class Config:
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', False)
     SESSION_COOKIE_HTTPONLY = True
     REMEMBER_COOKIE_DURATION = timedelta(days=30)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')  # changing it rehashes on next login
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # concurrent hashes per process
+    PASSWORD_HASH_QUEUE_TIMEOUT = 2.0  # seconds to wait for a slot before answering 503
+    
+    # Cold start: defer optional extensions and skip Flask-Migrate (default on Vercel).
+    # Run `flask db ...` with LEAN_STARTUP=0.
+    LEAN_STARTUP = os.environ.get('LEAN_STARTUP', '1' if os.environ.get('VERCEL') else '0').lower() in ('1', 'true', 'yes')
+    
+    # Catalog loaded into an empty database on first request (relative to the app root; empty disables)
+    SEED_CATALOG = os.environ.get('SEED_CATALOG', 'data/tools.jsonl')
+    
+    # Anonymous visitors live in the session; rows made when they act are swept once idle
+    ANONYMOUS_USER_MAX_AGE_DAYS = 30
+    ANONYMOUS_SWEEP_INTERVAL = 3600  # seconds between background sweeps per worker; 0 disables
+    ANONYMOUS_SWEEP_BATCH_SIZE = 500
     
     # Pagination
     TOOLS_PER_PAGE = 20
     POSTS_PER_PAGE = 10
+    PAGINATION_COUNT_TTL = 60  # seconds to cache listing totals; None skips counting
+    COMMENT_MAX_DEPTH = 6  # reply levels loaded below top-level comments
+    COMMENT_MAX_SIBLINGS = 50  # replies shown per comment
+    
+    # Caching
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))  # seconds; bounds cross-worker staleness
+    COUNTER_FLUSH_INTERVAL = 5  # seconds between write-behind hit counter flushes
+    COUNTER_FLUSH_THRESHOLD = 500  # distinct rows buffered before an early flush
+    USER_STATS_CACHE_TTL = 300  # seconds
+    CONTENT_VERSION_TTL = 2  # seconds between content_versions reads; bounds cross-worker ETag staleness
+    HTTP_CACHE_MAX_AGE = 0  # browsers revalidate every time (cheap 304s)
+    HTTP_CACHE_SHARED_MAX_AGE = int(os.environ.get('HTTP_CACHE_SHARED_MAX_AGE', 60))  # s-maxage for the edge
+    RELEASE = os.environ.get('RELEASE', os.environ.get('VERCEL_GIT_COMMIT_SHA', ''))  # part of every ETag
+    USER_CACHE_TTL = 60  # seconds a logged-in user is served without a query; bounds cross-worker staleness
+    FRAGMENT_CACHE_MAX_ENTRIES = 2048  # cached listing pages and fragments per process
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # memory cap
+    
+    # Probes
+    ROW_COUNT_REFRESH_INTERVAL = 60  # seconds between background row count refreshes (/api/stats)
+    
+    # Related tools (flask related-tools)
+    RELATED_TOOLS_K = 8  # neighbors stored per tool
+    RELATED_TOOLS_COFOLLOW_WEIGHT = 0.3  # share of co-follow similarity vs text (TF-IDF) similarity
+    
+    # Metrics
+    METRICS_DIR = os.environ.get('METRICS_DIR', '')  # shared by all workers of one server; empty = this process only
+    METRICS_FLUSH_INTERVAL = 5  # seconds between writes of a worker's totals to METRICS_DIR
+    QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', 25))  # SQL statements per request before a warning; 0 = off
+    QUERY_BUDGET_RAISE = os.environ.get('QUERY_BUDGET_RAISE', '').lower() in ('1', 'true', 'yes')  # fail instead (tests)
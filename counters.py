@@ -0,0 +1,122 @@
+"""
+Write-behind hit counters
+Page views are buffered in-process and flushed as batched
+UPDATE ... SET col = col + n statements instead of a commit per hit.
+"""
+
+import atexit
+import os
+import threading
+import time
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm.attributes import set_committed_value
+from database import db
+
+class CounterBuffer:
+    """Coalesces increments per (model, column, id) until the next flush"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 5
+        self.threshold = 500
+        self._pending = {}   # (model, column name, id) -> count
+        self._inflight = {}  # being written by the current flush
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._worker_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('COUNTER_FLUSH_INTERVAL', self.interval)
+        self.threshold = app.config.get('COUNTER_FLUSH_THRESHOLD', self.threshold)
+        app.extensions['hit_counter'] = self
+        atexit.register(self.flush)
+
+    def increment(self, column, obj_id, amount=1):
+        """Buffer `amount` hits for e.g. Tool.downloads of row obj_id"""
+        key = (column.class_, column.key, obj_id)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+            size = len(self._pending)
+
+        self._ensure_worker()
+        if size >= self.threshold:
+            self.flush()
+
+    def pending(self, column, obj_id):
+        """Hits for this row not yet visible in the database"""
+        key = (column.class_, column.key, obj_id)
+        with self._lock:
+            return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    def apply_pending(self, obj, *columns):
+        """Show buffered hits on a loaded instance without marking it dirty"""
+        for column in columns:
+            delta = self.pending(column, obj.id)
+            if delta:
+                current = getattr(obj, column.key) or 0
+                set_committed_value(obj, column.key, current + delta)
+        return obj
+
+    def flush(self):
+        """Write all buffered hits; returns the number of rows updated"""
+        if self.app is None:
+            return 0
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._inflight = pending
+            if not pending:
+                return 0
+
+            groups = {}
+            for (model, name, obj_id), amount in pending.items():
+                groups.setdefault((model, name), []).append({'row_id': obj_id, 'amount': amount})
+
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as conn:
+                        for (model, name), rows in groups.items():
+                            table = model.__table__
+                            column = table.c[name]
+                            values = {name: func.coalesce(column, 0) + bindparam('amount')}
+                            if 'updated_at' in table.c:
+                                # A hit is not an edit: keep the row's onupdate timestamp
+                                values['updated_at'] = table.c.updated_at
+                            stmt = (table.update()
+                                    .where(table.c.id == bindparam('row_id'))
+                                    .values(values))
+                            conn.execute(stmt, rows)
+            except Exception:
+                self.app.logger.exception('Counter flush failed; keeping hits for the next attempt')
+                with self._lock:
+                    for key, amount in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + amount
+                    self._inflight = {}
+                return 0
+
+            with self._lock:
+                self._inflight = {}
+            return len(pending)
+
+    def _ensure_worker(self):
+        """Start the periodic flusher once per process (survives forking servers)"""
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+        thread = threading.Thread(target=self._run, name='hit-counter-flush', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+hit_counter = CounterBuffer()
@@ -54,6 +54,18 @@ class Tool(db.Model):
     # Relationships
     followers = db.relationship('UserTool', backref='tool', lazy=True)
     
+    # Hot paths: filtered listings seek on (name, id); see queryplan.py
+    __table_args__ = (
+        db.Index('ix_tools_name_id', 'name', 'id'),
+        db.Index('ix_tools_platform_name', 'platform', 'name', 'id'),
+        db.Index('ix_tools_platform_category_name', 'platform', 'category', 'name', 'id'),
+        db.Index('ix_tools_category_name', 'category', 'name', 'id'),
+        db.Index('ix_tools_difficulty_name', 'difficulty', 'name', 'id'),
+        db.Index('ix_tools_verified_id', 'is_verified', 'id'),
+        db.Index('ix_tools_created_at', 'created_at'),
+        db.Index('ix_tools_updated_at', 'updated_at'),
+    )
+    
     def __repr__(self):
         return f'<Tool {self.name}>'
 
@@ -67,7 +79,11 @@ class UserTool(db.Model):
     skill_level = db.Column(db.String(20), default='beginner')
     followed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'tool_id', name='_user_tool_uc'),)
+    # The unique constraint also serves lookups by user_id
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'tool_id', name='_user_tool_uc'),
+        db.Index('ix_user_tools_tool_id', 'tool_id'),
+    )
 
 class Post(db.Model):
     __tablename__ = 'posts'
@@ -80,6 +96,7 @@ class Post(db.Model):
     tool_id = db.Column(db.Integer, db.ForeignKey('tools.id'))
     upvotes = db.Column(db.Integer, default=0)
     downvotes = db.Column(db.Integer, default=0)
+    views = db.Column(db.Integer, default=0)
     is_pinned = db.Column(db.Boolean, default=False)
     is_locked = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -88,6 +105,13 @@ class Post(db.Model):
     # Relationships
     comments = db.relationship('Comment', backref='post', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_posts_feed', 'is_locked', 'created_at', 'id'),
+        db.Index('ix_posts_type_feed', 'is_locked', 'post_type', 'created_at', 'id'),
+        db.Index('ix_posts_pinned', 'is_pinned', 'created_at'),
+        db.Index('ix_posts_user_id', 'user_id'),
+    )
+    
     def __repr__(self):
         return f'<Post {self.title}>'
 
@@ -106,6 +130,12 @@ class Comment(db.Model):
     # Self-referential relationship for nested comments
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_comments_post_parent', 'post_id', 'parent_id'),
+        db.Index('ix_comments_parent_id', 'parent_id'),
+        db.Index('ix_comments_user_id', 'user_id'),
+    )
+    
     def __repr__(self):
         return f'<Comment {self.id}>'
 
@@ -124,5 +154,33 @@ class CTFChallenge(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_ctf_challenges_active_difficulty', 'is_active', 'difficulty'),
+    )
+    
     def __repr__(self):
         return f'<CTFChallenge {self.title}>'
+
+class ContentVersion(db.Model):
+    """Version counter per content kind, bumped in the same transaction as the write"""
+    __tablename__ = 'content_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)  # tools, posts, ctf
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class RelatedTool(db.Model):
+    """Precomputed top-K neighbors of a tool; see similarity.py"""
+    __tablename__ = 'related_tools'
+    
+    tool_id = db.Column(db.Integer, db.ForeignKey('tools.id'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)  # 0 = most similar
+    related_id = db.Column(db.Integer, db.ForeignKey('tools.id'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+class ToolSignature(db.Model):
+    """Hash of the inputs a tool's neighbors were computed from"""
+    __tablename__ = 'tool_signatures'
+    
+    tool_id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.String(40), nullable=False)
@@ -0,0 +1,63 @@
+"""
+Rendered-fragment cache
+Listing pages are the same for every visitor with the same filters until
+the catalog changes. Their data (and, for anonymous visitors, the rendered
+HTML) is kept in a bounded in-process LRU keyed by the normalized filter
+tuple plus the shared content version, so any catalog write retires the
+old entries.
+"""
+
+import sys
+from cache import LRUCache
+
+def approx_size(value, _depth=0):
+    """Rough size in bytes of a cached value (strings, containers, plain objects)"""
+    size = sys.getsizeof(value)
+    if _depth > 6 or isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+                          for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(item, _depth + 1) for item in value)
+    if hasattr(value, '__dict__'):
+        return size + approx_size(vars(value), _depth + 1)
+    return size
+
+class FragmentCache:
+    """Bounded LRU of rendered fragments and page data, with a memory cap"""
+
+    def __init__(self, app=None):
+        self._cache = LRUCache(maxsize=2048, maxbytes=32 * 1024 * 1024, sizeof=approx_size)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._cache.maxsize = app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', self._cache.maxsize)
+        self._cache.maxbytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', self._cache.maxbytes)
+        app.extensions['fragment_cache'] = self
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def get_or_build(self, key, build):
+        """Cached value for key, calling build() on a miss"""
+        value = self._cache.get(key)
+        if value is None:
+            value = build()
+            self._cache.set(key, value)
+        return value
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['max_entries'] = self._cache.maxsize
+        stats['max_bytes'] = self._cache.maxbytes
+        return stats
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,215 @@
+"""
+Session-only anonymous users
+A guest lives entirely in the signed session cookie. The first action that
+has to be stored (following a tool, posting, commenting, editing the
+profile) promotes it to an anonymous User row. Rows left behind by old
+anonymous visits are removed by a batched background sweeper.
+"""
+
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app, session
+from flask.cli import with_appcontext
+from flask_login import UserMixin, current_user, login_user
+from sqlalchemy import delete, exists, select
+from database import db, User, UserTool, Post, Comment
+from hashing import UNUSABLE_PASSWORD
+from identity import invalidate_user
+
+GUEST_PREFIX = 'guest:'
+
+class GuestUser(UserMixin):
+    """Logged-in anonymous visitor without a database row"""
+
+    id = None
+    anonymous = True
+    email = None
+    created_at = None
+    last_login = None
+
+    def __init__(self, token, data):
+        self.token = token
+        self._data = data
+
+    @classmethod
+    def start(cls):
+        """New guest identity, stored in the session"""
+        token = secrets.token_hex(4)
+        session['guest'] = {'token': token, 'experience': 'beginner', 'resources': []}
+        return cls(token, session['guest'])
+
+    @classmethod
+    def load(cls, user_id):
+        """Flask-Login user_loader half for 'guest:<token>' ids"""
+        data = session.get('guest')
+        if not data or GUEST_PREFIX + data.get('token', '') != user_id:
+            return None
+        return cls(data['token'], data)
+
+    def get_id(self):
+        return GUEST_PREFIX + self.token
+
+    @property
+    def username(self):
+        return f'Anonymous_{self.token}'
+
+    @property
+    def experience(self):
+        return self._data.get('experience', 'beginner')
+
+    @experience.setter
+    def experience(self, value):
+        self._data['experience'] = value
+        session.modified = True
+
+    @property
+    def resources(self):
+        return json.dumps(self._data.get('resources', []))
+
+    def get_resources(self):
+        return list(self._data.get('resources', []))
+
+    def set_resources(self, resources_list):
+        self._data['resources'] = list(resources_list)
+        session.modified = True
+
+    def __repr__(self):
+        return f'<Guest {self.token}>'
+
+def is_guest_id(user_id):
+    return user_id.startswith(GUEST_PREFIX)
+
+def persistent_user():
+    """The current user as a database row, promoting a guest first.
+
+    Call this instead of current_user before writing anything that refers
+    to the user; the promoted row is flushed, not committed.
+    """
+    user = current_user._get_current_object()
+    if not isinstance(user, GuestUser):
+        return user
+
+    username = user.username
+    while User.query.filter_by(username=username).first() is not None:
+        username = f'Anonymous_{secrets.token_hex(4)}'
+
+    row = User(
+        username=username,
+        email=f'{username}@anonymous.hackerhub',
+        password_hash=UNUSABLE_PASSWORD,  # No password login for anonymous users
+        experience=user.experience,
+        resources=user.resources,
+        anonymous=True,
+        is_active=True,
+        last_login=datetime.utcnow(),
+    )
+    db.session.add(row)
+    db.session.flush()
+
+    session.pop('guest', None)
+    login_user(row)
+    return row
+
+# ==================== SWEEPER ====================
+
+def _stale_anonymous_ids(cutoff, limit):
+    """Anonymous users idle since cutoff that never posted or commented"""
+    last_seen = db.func.coalesce(User.last_login, User.created_at)
+    return db.session.execute(
+        select(User.id)
+        .where(User.anonymous.is_(True), last_seen < cutoff)
+        .where(~exists().where(Post.user_id == User.id))
+        .where(~exists().where(Comment.user_id == User.id))
+        .order_by(User.id)
+        .limit(limit)
+    ).scalars().all()
+
+def sweep_anonymous_users(max_age, batch_size=500, max_batches=None, pause=0.0):
+    """Delete stale anonymous users and their follows, one batch per commit.
+
+    Returns the number of users removed.
+    """
+    cutoff = datetime.utcnow() - max_age
+    removed = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = _stale_anonymous_ids(cutoff, batch_size)
+        if not ids:
+            break
+        db.session.execute(delete(UserTool).where(UserTool.user_id.in_(ids)))
+        db.session.execute(delete(User).where(User.id.in_(ids), User.anonymous.is_(True)))
+        db.session.commit()
+        for user_id in ids:
+            invalidate_user(user_id)
+        removed += len(ids)
+        batches += 1
+        if pause:
+            time.sleep(pause)  # let foreground writes in between batches
+    return removed
+
+class AnonymousSweeper:
+    """Runs sweep_anonymous_users periodically on a daemon thread per process"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 3600
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('ANONYMOUS_SWEEP_INTERVAL', self.interval)
+        app.extensions['anonymous_sweeper'] = self
+        if self.interval:
+            # Started from a request so forking servers get one per worker
+            app.before_request(self._ensure_worker)
+
+    def sweep(self):
+        with self.app.app_context():
+            config = self.app.config
+            return sweep_anonymous_users(
+                timedelta(days=config.get('ANONYMOUS_USER_MAX_AGE_DAYS', 30)),
+                batch_size=config.get('ANONYMOUS_SWEEP_BATCH_SIZE', 500),
+                pause=0.1)
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+        thread = threading.Thread(target=self._run, name='anonymous-sweeper', daemon=True)
+        thread.start()
+
+    def _run(self):
+        # Spread workers out so they do not all sweep at the same moment
+        time.sleep(random.uniform(0, self.interval))
+        while True:
+            try:
+                removed = self.sweep()
+                if removed:
+                    self.app.logger.info('Removed %d stale anonymous users', removed)
+            except Exception:
+                self.app.logger.exception('Anonymous user sweep failed')
+            time.sleep(self.interval)
+
+anonymous_sweeper = AnonymousSweeper()
+
+@click.command('sweep-anonymous')
+@click.option('--days', type=int, help='idle age in days (default: ANONYMOUS_USER_MAX_AGE_DAYS)')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def sweep_anonymous_command(days, batch_size):
+    """Delete stale anonymous users that never posted or commented."""
+    days = days if days is not None else current_app.config.get('ANONYMOUS_USER_MAX_AGE_DAYS', 30)
+    removed = sweep_anonymous_users(timedelta(days=days), batch_size=batch_size)
+    click.echo(f'Removed {removed} anonymous users idle for more than {days} days')
@@ -0,0 +1,148 @@
+"""
+Bounded password hashing
+The KDF runs on a small per-process pool instead of the request thread.
+When every slot stays busy for PASSWORD_HASH_QUEUE_TIMEOUT seconds the
+request fails fast with a 503, so a login burst cannot starve page views.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import (generate_password_hash, check_password_hash,
+                               DEFAULT_PBKDF2_ITERATIONS)
+
+# Stored for accounts that must never match a password
+UNUSABLE_PASSWORD = '!'
+
+class HashingBusy(ServiceUnavailable):
+    description = 'Too many sign-ins right now. Please try again in a moment.'
+
+def canonical_method(method):
+    """Spell out werkzeug's defaults, as they appear in stored hashes"""
+    if method == 'scrypt':
+        return 'scrypt:32768:8:1'
+    if method == 'pbkdf2':
+        method = 'pbkdf2:sha256'
+    if method.startswith('pbkdf2:') and method.count(':') == 1:
+        return f'{method}:{DEFAULT_PBKDF2_ITERATIONS}'
+    return method
+
+class PasswordHasher:
+    """Runs generate/check_password_hash with a concurrency cap"""
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.workers = 2
+        self.queue_timeout = 2.0
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._in_use = 0
+        self.reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', self.queue_timeout)
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """New hash with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        if not pwhash or '$' not in pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when pwhash was made with a different method or cost"""
+        if not pwhash or '$' not in pwhash:
+            return False
+        return pwhash.split('$', 1)[0] != canonical_method(self.method)
+
+    def verify_and_update(self, user, password):
+        """Check a login; upgrade the stored hash if the configured cost changed.
+
+        The caller commits. A rehash that cannot get a slot is skipped and
+        retried on the next login.
+        """
+        if not self.verify(user.password_hash, password):
+            return False
+        if self.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = self.hash(password)
+            except HashingBusy:
+                pass
+        return True
+
+    # ==================== POOL ====================
+
+    def _pool(self):
+        """Executor and slot semaphore, recreated once per process after forking"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                    self._slots = threading.BoundedSemaphore(self.workers)
+                    self._pid = pid
+        return self._executor, self._slots
+
+    def _run(self, func, *args):
+        executor, slots = self._pool()
+        queued = time.perf_counter()
+        if not slots.acquire(timeout=self.queue_timeout):
+            self._record(rejected=True, wait=time.perf_counter() - queued)
+            raise HashingBusy(retry_after=max(1, round(self.queue_timeout)))
+        started = time.perf_counter()
+        self._adjust_in_use(1)
+        try:
+            result = executor.submit(func, *args).result()
+        finally:
+            self._adjust_in_use(-1)
+            slots.release()
+        self._record(wait=started - queued, seconds=time.perf_counter() - started)
+        return result
+
+    # ==================== METRICS ====================
+
+    def _adjust_in_use(self, delta):
+        with self._lock:
+            self._in_use += delta
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'hashes': 0, 'rejected': 0,
+                'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0,
+                'hash_seconds_total': 0.0, 'hash_seconds_max': 0.0,
+            }
+
+    def _record(self, wait, seconds=None, rejected=False):
+        with self._lock:
+            stats = self._stats
+            stats['wait_seconds_total'] += wait
+            stats['wait_seconds_max'] = max(stats['wait_seconds_max'], wait)
+            if rejected:
+                stats['rejected'] += 1
+                return
+            stats['hashes'] += 1
+            stats['hash_seconds_total'] += seconds
+            stats['hash_seconds_max'] = max(stats['hash_seconds_max'], seconds)
+
+    def stats(self):
+        """Counters for this process: queue wait and KDF time in seconds"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_use'] = self._in_use
+        stats['workers'] = self.workers
+        return stats
+
+password_hasher = PasswordHasher()
@@ -3,6 +3,10 @@ import os
 import time
 from datetime import datetime
 import getpass
+from array import array
+from bisect import bisect_right
+from functools import cached_property
+from catalogfile import CatalogFile, encode_catalog, read_jsonl, write_catalog
 
 # ==================== DATA STRUCTURES ====================
 class User:
@@ -15,6 +19,8 @@ class User:
         self.followed_tools = []
         
 class Tool:
+    __slots__ = ('name', 'platform', 'category', 'subcategory', 'description', 'difficulty')
+    
     def __init__(self, name, platform, category, subcategory, description, difficulty):
         self.name = name
         self.platform = platform
@@ -24,157 +30,178 @@ class Tool:
         self.difficulty = difficulty  # Beginner, Intermediate, Advanced
         
 # ==================== TOOLS DATABASE ====================
-def initialize_tools_database():
-    tools = {
-        "Phone": {
-            "Android": {
-                "Persistence": [
-                    Tool("Metasploit Android Payload", "Phone", "Persistence", "Android", 
-                         "Generate persistent backdoor for Android", "Intermediate"),
-                    Tool("AhMyth Android RAT", "Phone", "Persistence", "Android",
-                         "Remote Administration Tool for Android", "Advanced")
-                ],
-                "Reverse Engineering": [
-                    Tool("JADX", "Phone", "Reverse Engineering", "Android",
-                         "Dex to Java decompiler", "Beginner"),
-                    Tool("APKTool", "Phone", "Reverse Engineering", "Android",
-                         "Reverse engineering APK files", "Intermediate")
-                ],
-                "Forensics": [
-                    Tool("MobSF", "Phone", "Forensics", "Android",
-                         "Mobile Security Framework", "Intermediate")
-                ]
-            },
-            "iOS": {
-                "Persistence": [
-                    Tool("Cydia Impactor", "Phone", "Persistence", "iOS",
-                         "Jailbreak tool for iOS", "Advanced")
-                ],
-                "Reverse Engineering": [
-                    Tool("Hopper Disassembler", "Phone", "Reverse Engineering", "iOS",
-                         "Reverse engineering platform", "Advanced")
-                ]
-            }
-        },
+# `flask export-catalog` writes the web app's catalog to data/tools.cat, and
+# that export is what the console reads. Without one, the console falls back
+# to data/tools.jsonl (the web app's seed), compiled to its own cache file
+# whenever the JSONL is newer; an export is never overwritten.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CATALOG_FILE = os.path.join(DATA_DIR, 'tools.cat')
+CATALOG_SOURCE = os.path.join(DATA_DIR, 'tools.jsonl')
+COMPILED_SOURCE = os.path.join(DATA_DIR, 'tools.jsonl.cat')
+
+def load_catalog(exported=CATALOG_FILE, source=CATALOG_SOURCE, compiled=COMPILED_SOURCE):
+    """Open the exported catalog, or the compiled JSONL fallback"""
+    if os.path.exists(exported):
+        return Catalog(CatalogFile(exported))
+    if not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(source):
+        try:
+            write_catalog(read_jsonl(source), compiled)
+        except OSError:
+            # Read-only install: compile in memory instead
+            return Catalog(CatalogFile(encode_catalog(read_jsonl(source))))
+    return Catalog(CatalogFile(compiled))
+
+# ==================== CATALOG INDEX ====================
+# Console recommendations: the difficulties each experience level is shown,
+# and which resources run a platform (by words in its name). The web
+# dashboard scores tools differently (profiles.py).
+CONSOLE_LEVELS = {
+    'beginner': ('beginner',),
+    'intermediate': ('beginner', 'intermediate'),
+    'advanced': ('beginner', 'intermediate', 'advanced'),
+    'elite': ('beginner', 'intermediate', 'advanced'),
+}
+CONSOLE_PLATFORMS = (
+    (('phone', 'android', 'ios'), ('phone',)),
+    (('linux',), ('pc/laptop', 'hacking lab', 'dedicated linux machine')),
+    (('windows',), ('pc/laptop',)),
+    (('web',), ('pc/laptop',)),
+)
+
+def console_can_run(platform, resources):
+    """Whether one of resources (lowercase) runs platform"""
+    platform = platform.lower()
+    return any(any(word in platform for word in words) and not resources.isdisjoint(needs)
+               for words, needs in CONSOLE_PLATFORMS)
+
+SEARCH_COLUMNS = ('name', 'description', 'category', 'subcategory')
+
+class Catalog:
+    """Indexed view of a columnar catalog source (see catalogfile.py).
+    
+    Menus are walked platform > distribution (tool.subcategory) >
+    category, in catalog order. Every index is built from string ids on
+    first use, and Tool objects are only created for tools being shown.
+    """
+    
+    def __init__(self, source):
+        self.source = source
+    
+    def __len__(self):
+        return len(self.source)
+    
+    def tool(self, i):
+        value = self.source.value
+        return Tool(value('name', i), value('platform', i), value('category', i),
+                    value('subcategory', i), value('description', i),
+                    value('difficulty', i).capitalize())
+    
+    def _group(self, *columns):
+        """Nested {value: ... {value: array of tool indexes}} over columns"""
+        groups = {}
+        for i, ids in enumerate(zip(*(self.source.ids(column) for column in columns))):
+            node = groups
+            for string_id in ids[:-1]:
+                node = node.setdefault(string_id, {})
+            node.setdefault(ids[-1], array('I')).append(i)
+        return self._decode(groups)
+    
+    def _decode(self, node):
+        if isinstance(node, array):
+            return node
+        return {self.source.string(string_id): self._decode(child) for string_id, child in node.items()}
+    
+    @cached_property
+    def tree(self):
+        return self._group('platform', 'subcategory', 'category')
+    
+    @cached_property
+    def platforms(self):
+        return list(self.tree)
+    
+    @cached_property
+    def by_platform(self):
+        return self._group('platform')
+    
+    @cached_property
+    def by_category(self):
+        return self._group('category')
+    
+    @cached_property
+    def by_difficulty(self):
+        groups = {}
+        for difficulty, indexes in self._group('difficulty').items():
+            groups.setdefault(difficulty.lower(), array('I')).extend(indexes)
+        return groups
+    
+    def groups(self, platform):
+        return list(self.tree[platform])
+    
+    def categories(self, platform, group):
+        return list(self.tree[platform][group])
+    
+    def tools_in(self, platform, group, category):
+        return [self.tool(i) for i in self.tree[platform][group][category]]
+    
+    @cached_property
+    def _search_index(self):
+        """Lowercased search text of every tool in one string, and where each starts"""
+        source = self.source
+        lowered = {}  # each distinct string is lowercased once
+        starts = array('I')
+        parts = []
+        position = 0
+        for i, ids in enumerate(zip(*(source.ids(column) for column in SEARCH_COLUMNS))):
+            fields = []
+            for string_id in ids:
+                if string_id not in lowered:
+                    lowered[string_id] = source.string(string_id).lower()
+                fields.append(lowered[string_id])
+            text = "\n".join(fields)
+            starts.append(position)
+            parts.append(text)
+            position += len(text) + 1
+        starts.append(position)  # end sentinel
+        return "\0".join(parts), starts
+    
+    def search(self, term):
+        """Tools whose name, description, category or subcategory contain term.
         
-        "Linux": {
-            "Kali Linux": {
-                "Information Gathering": [
-                    Tool("Nmap", "Linux", "Information Gathering", "Kali Linux",
-                         "Network discovery and security auditing", "Beginner"),
-                    Tool("theHarvester", "Linux", "Information Gathering", "Kali Linux",
-                         "Email, subdomain, and name scraping", "Beginner")
-                ],
-                "Vulnerability Analysis": [
-                    Tool("OpenVAS", "Linux", "Vulnerability Analysis", "Kali Linux",
-                         "Open source vulnerability scanner", "Intermediate"),
-                    Tool("Nikto", "Linux", "Vulnerability Analysis", "Kali Linux",
-                         "Web server scanner", "Beginner")
-                ],
-                "Web Application Analysis": [
-                    Tool("Burp Suite", "Linux", "Web Application Analysis", "Kali Linux",
-                         "Web vulnerability scanner", "Intermediate"),
-                    Tool("SQLmap", "Linux", "Web Application Analysis", "Kali Linux",
-                         "Automatic SQL injection tool", "Intermediate")
-                ],
-                "Password Attacks": [
-                    Tool("John the Ripper", "Linux", "Password Attacks", "Kali Linux",
-                         "Password cracker", "Intermediate"),
-                    Tool("Hashcat", "Linux", "Password Attacks", "Kali Linux",
-                         "Advanced password recovery", "Advanced")
-                ],
-                "Wireless Attacks": [
-                    Tool("Aircrack-ng", "Linux", "Wireless Attacks", "Kali Linux",
-                         "WiFi security auditing tools", "Intermediate")
-                ],
-                "Reverse Engineering": [
-                    Tool("Ghidra", "Linux", "Reverse Engineering", "Kali Linux",
-                         "Software reverse engineering suite", "Advanced"),
-                    Tool("Radare2", "Linux", "Reverse Engineering", "Kali Linux",
-                         "Unix-like reverse engineering framework", "Advanced")
-                ],
-                "Exploitation Tools": [
-                    Tool("Metasploit Framework", "Linux", "Exploitation Tools", "Kali Linux",
-                         "Penetration testing platform", "Intermediate"),
-                    Tool("BeEF", "Linux", "Exploitation Tools", "Kali Linux",
-                         "Browser Exploitation Framework", "Intermediate")
-                ],
-                "Post Exploitation": [
-                    Tool("Meterpreter", "Linux", "Post Exploitation", "Kali Linux",
-                         "Advanced payload for Metasploit", "Advanced"),
-                    Tool("Empire", "Linux", "Post Exploitation", "Kali Linux",
-                         "Post-exploitation framework", "Advanced")
-                ],
-                "Forensics": [
-                    Tool("Autopsy", "Linux", "Forensics", "Kali Linux",
-                         "Digital forensics platform", "Intermediate"),
-                    Tool("Volatility", "Linux", "Forensics", "Kali Linux",
-                         "Memory forensics framework", "Advanced")
-                ],
-                "Social Engineering": [
-                    Tool("Social Engineer Toolkit (SET)", "Linux", "Social Engineering", "Kali Linux",
-                         "Penetration testing for social engineering", "Intermediate")
-                ],
-                "Sniffing & Spoofing": [
-                    Tool("Wireshark", "Linux", "Sniffing & Spoofing", "Kali Linux",
-                         "Network protocol analyzer", "Beginner"),
-                    Tool("Ettercap", "Linux", "Sniffing & Spoofing", "Kali Linux",
-                         "Comprehensive MITM attack suite", "Intermediate")
-                ]
-            },
-            "Ubuntu": {
-                "Container Security": [
-                    Tool("Docker Bench Security", "Linux", "Container Security", "Ubuntu",
-                         "Security checks for Docker containers", "Intermediate"),
-                    Tool("Clair", "Linux", "Container Security", "Ubuntu",
-                         "Static analysis for Docker containers", "Advanced")
-                ]
-            },
-            "Termux": {
-                "Mobile Hacking": [
-                    Tool("Termux-API", "Linux", "Mobile Hacking", "Termux",
-                         "Access phone features from Termux", "Beginner"),
-                    Tool("Nmap (Termux)", "Linux", "Mobile Hacking", "Termux",
-                         "Network scanner for Android", "Beginner")
-                ]
-            }
-        },
+        Whole-word matches come first, then other substring matches, each in
+        catalog order.
+        """
+        term = term.strip().lower()
+        if not term or "\n" in term or "\0" in term:
+            return []
+        text, starts = self._search_index
         
-        "Windows": {
-            "General": {
-                "Reverse Engineering": [
-                    Tool("IDA Pro", "Windows", "Reverse Engineering", "General",
-                         "Interactive disassembler", "Advanced"),
-                    Tool("x64dbg", "Windows", "Reverse Engineering", "General",
-                         "Open-source debugger", "Intermediate")
-                ],
-                "Forensics": [
-                    Tool("FTK Imager", "Windows", "Forensics", "General",
-                         "Forensic imaging tool", "Intermediate"),
-                    Tool("Autopsy (Windows)", "Windows", "Forensics", "General",
-                         "Digital forensics", "Intermediate")
-                ]
-            }
-        },
+        # str.find over the joined text, skipping to the next tool after each hit
+        exact, partial = [], []
+        position = text.find(term)
+        while position != -1:
+            i = bisect_right(starts, position) - 1
+            words = text[starts[i]:starts[i + 1] - 1].split()
+            (exact if term in words else partial).append(i)
+            position = text.find(term, starts[i + 1])
+        return [self.tool(i) for i in exact + partial]
+    
+    def recommend(self, experience, resources, limit=5):
+        """Tools the console recommends for a profile, in menu order"""
+        shown = CONSOLE_LEVELS.get((experience or '').lower(), ())
+        resources = {resource.lower() for resource in resources or ()}
+        runnable = set().union(*(self.by_platform[p] for p in self.platforms
+                                 if console_can_run(p, resources)))
         
-        "Web": {
-            "General": {
-                "Bug Bounty": [
-                    Tool("Burp Suite Professional", "Web", "Bug Bounty", "General",
-                         "Web vulnerability scanner", "Intermediate"),
-                    Tool("OWASP ZAP", "Web", "Bug Bounty", "General",
-                         "Web app security scanner", "Beginner")
-                ],
-                "Reconnaissance": [
-                    Tool("Sublist3r", "Web", "Reconnaissance", "General",
-                         "Subdomain enumeration tool", "Beginner"),
-                    Tool("Wayback Machine", "Web", "Reconnaissance", "General",
-                         "Historical web page archive", "Beginner")
-                ]
-            }
-        }
-    }
-    return tools
+        results = []
+        for groups in self.tree.values():
+            for categories in groups.values():
+                for indexes in categories.values():
+                    for i in indexes:
+                        if i in runnable and self.source.value('difficulty', i).lower() in shown:
+                            results.append(i)
+                            if len(results) == limit:
+                                return [self.tool(i) for i in results]
+        return [self.tool(i) for i in results]
 
 # ==================== DISPLAY FUNCTIONS ====================
 def clear_screen():
@@ -358,13 +385,13 @@ def resource_selection(user):
     return main_menu(user)
 
 # ==================== TOOLS BROWSER ====================
-def browse_tools(user, tools_db):
+def browse_tools(user, catalog):
     while True:
         print_header("TOOLS DIRECTORY")
         print(f"User: {user.username} | Experience: {user.experience}\n")
         print("Select platform:\n")
         
-        platforms = list(tools_db.keys())
+        platforms = catalog.platforms
         for i, platform in enumerate(platforms, 1):
             print(f"{i}. {platform}")
         
@@ -377,9 +404,9 @@ def browse_tools(user, tools_db):
             
             if 1 <= choice <= len(platforms):
                 platform_name = platforms[choice-1]
-                platform_tools(tools_db[platform_name], platform_name, user, tools_db)
+                platform_tools(platform_name, user, catalog)
             elif choice == len(platforms)+1:
-                search_tools(user, tools_db)
+                search_tools(user, catalog)
             elif choice == len(platforms)+2:
                 show_followed_tools(user)
             elif choice == len(platforms)+3:
@@ -391,12 +418,12 @@ def browse_tools(user, tools_db):
             print("❌ Please enter a number")
             time.sleep(1)
 
-def platform_tools(platform_data, platform_name, user, tools_db):
+def platform_tools(platform_name, user, catalog):
     while True:
         print_header(f"{platform_name.upper()} TOOLS")
         print("Select category/distribution:\n")
         
-        categories = list(platform_data.keys())
+        categories = catalog.groups(platform_name)
         for i, category in enumerate(categories, 1):
             print(f"{i}. {category}")
         
@@ -407,8 +434,8 @@ def platform_tools(platform_data, platform_name, user, tools_db):
             
             if 1 <= choice <= len(categories):
                 category_name = categories[choice-1]
-                category_tools(platform_data[category_name], f"{platform_name} - {category_name}", 
-                              user, tools_db, platform_name, category_name)
+                category_tools(f"{platform_name} - {category_name}", 
+                              user, catalog, platform_name, category_name)
             elif choice == len(categories)+1:
                 return
             else:
@@ -418,14 +445,14 @@ def platform_tools(platform_data, platform_name, user, tools_db):
             print("❌ Please enter a number")
             time.sleep(1)
 
-def category_tools(category_data, full_path, user, tools_db, platform, category):
+def category_tools(full_path, user, catalog, platform, category):
     while True:
         print_header(f"{full_path.upper()}")
         print("Select subcategory:\n")
         
-        subcategories = list(category_data.keys())
+        subcategories = catalog.categories(platform, category)
         for i, subcat in enumerate(subcategories, 1):
-            tool_count = len(category_data[subcat])
+            tool_count = len(catalog.tree[platform][category][subcat])
             print(f"{i}. {subcat} ({tool_count} tools)")
         
         print(f"{len(subcategories)+1}. ↩️ Back")
@@ -435,7 +462,7 @@ def category_tools(category_data, full_path, user, tools_db, platform, category)
             
             if 1 <= choice <= len(subcategories):
                 subcat_name = subcategories[choice-1]
-                display_tools(category_data[subcat_name], f"{full_path} - {subcat_name}", 
+                display_tools(catalog.tools_in(platform, category, subcat_name), f"{full_path} - {subcat_name}", 
                              user, platform, category, subcat_name)
             elif choice == len(subcategories)+1:
                 return
@@ -529,7 +556,7 @@ def view_tool_details(tool, user):
     print("\nPress Enter to continue...")
     input()
 
-def search_tools(user, tools_db):
+def search_tools(user, catalog):
     print_header("SEARCH TOOLS")
     print("\nSearch for tools by name, category, or keyword\n")
     
@@ -538,18 +565,7 @@ def search_tools(user, tools_db):
     if not search_term:
         return
     
-    results = []
-    
-    # Search through all tools
-    for platform in tools_db.values():
-        for category in platform.values():
-            for subcategory in category.values():
-                for tool in subcategory:
-                    if (search_term in tool.name.lower() or 
-                        search_term in tool.description.lower() or
-                        search_term in tool.category.lower() or
-                        search_term in tool.subcategory.lower()):
-                        results.append(tool)
+    results = catalog.search(search_term)
     
     if not results:
         print(f"\n❌ No results found for '{search_term}'")
@@ -578,11 +594,11 @@ def search_tools(user, tools_db):
                 tool_num = int(input("Enter tool number: ")) - 1
                 if 0 <= tool_num < len(results):
                     view_tool_details(results[tool_num], user)
-                    return search_tools(user, tools_db)
+                    return search_tools(user, catalog)
             except ValueError:
                 print("❌ Invalid number")
         elif choice == "2":
-            return search_tools(user, tools_db)
+            return search_tools(user, catalog)
         elif choice == "3":
             return
         else:
@@ -650,7 +666,7 @@ def community_forum(user):
 
 # ==================== MAIN MENU ====================
 def main_menu(user):
-    tools_db = initialize_tools_database()
+    catalog = load_catalog()
     
     while True:
         print_header("HACKER HUB - MAIN MENU")
@@ -680,20 +696,19 @@ def main_menu(user):
         choice = input("\nSelect option: ").strip()
         
         if choice == "1":
-            browse_tools(user, tools_db)
+            browse_tools(user, catalog)
         elif choice == "2":
-            search_tools(user, tools_db)
+            search_tools(user, catalog)
         elif choice == "3":
             community_forum(user)
         elif choice == "4":
             show_learning_path(user)
         elif choice == "5":
-            show_recommended_tools(user, tools_db)
+            show_recommended_tools(user, catalog)
         elif choice == "6":
             profile_settings(user)
         elif choice == "7" and user.anonymous:
             user = sign_up()  # Returns a new user object
-            tools_db = initialize_tools_database()
         elif choice == "0":
             print("\n👋 Stay ethical, stay secure!")
             print("Remember: With great power comes great responsibility.\n")
@@ -750,38 +765,16 @@ def show_learning_path(user):
     print("\nPress Enter to continue...")
     input()
 
-def show_recommended_tools(user, tools_db):
+def show_recommended_tools(user, catalog):
     print_header("RECOMMENDED TOOLS")
     print(f"\nTools matched to your profile:\n")
     print(f"• Experience: {user.experience}")
     print(f"• Resources: {', '.join(user.resources)}\n")
     
-    recommendations = []
-    
-    # Filter tools based on user profile
-    for platform in tools_db.values():
-        for category in platform.values():
-            for subcategory in category.values():
-                for tool in subcategory:
-                    # Match difficulty to experience
-                    if (user.experience == "Beginner" and tool.difficulty == "Beginner") or \
-                       (user.experience == "Intermediate" and tool.difficulty in ["Beginner", "Intermediate"]) or \
-                       (user.experience in ["Advanced", "Elite"]):
-                        # Check if user has resources for this platform
-                        platform_lower = tool.platform.lower()
-                        user_resources_lower = [r.lower() for r in user.resources]
-                        
-                        if any(resource in platform_lower for resource in ["phone", "android", "ios"]) and "phone" in user_resources_lower:
-                            recommendations.append(tool)
-                        elif "linux" in platform_lower and any(r in ["pc/laptop", "hacking lab", "dedicated linux machine"] for r in user_resources_lower):
-                            recommendations.append(tool)
-                        elif "windows" in platform_lower and "pc/laptop" in user_resources_lower:
-                            recommendations.append(tool)
-                        elif "web" in platform_lower and "pc/laptop" in user_resources_lower:
-                            recommendations.append(tool)
+    recommendations = catalog.recommend(user.experience, user.resources, limit=5)
     
     # Show top 5 recommendations
-    for i, tool in enumerate(recommendations[:5], 1):
+    for i, tool in enumerate(recommendations, 1):
         print(f"{i}. {tool.name}")
         print(f"   {tool.description[:70]}...")
         print(f"   🎯 {tool.difficulty} | 📍 {tool.platform}")
@@ -0,0 +1,65 @@
+"""
+Cached user loading
+Flask-Login asks for the current user on every authenticated request. The
+row's columns are cached in-process for USER_CACHE_TTL seconds and turned
+back into a session-attached User without a query; any committed change
+to a user drops its entry.
+"""
+
+import threading
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from cache import LRUCache
+from database import db, User
+
+_users = LRUCache(maxsize=10000)
+_generation = 0
+_generation_lock = threading.Lock()
+
+def _snapshot(user):
+    return {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+
+def load_user(user_id):
+    """User for user_id, from the cache when possible"""
+    values = _users.get(user_id)
+    if values is None:
+        generation = _generation
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        # Skip the store if the user changed while we were reading
+        if generation == _generation:
+            _users.set(user_id, _snapshot(user), ttl=current_app.config.get('USER_CACHE_TTL'))
+        return user
+
+    # Rebuild as a clean persistent instance: updates and lazy loads work as usual
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+def user_cache_stats():
+    return _users.stats()
+
+def invalidate_user(user_id):
+    global _generation
+    with _generation_lock:
+        _generation += 1
+    _users.pop(user_id)
+
+# ==================== WRITE TRACKING ====================
+
+@event.listens_for(Session, 'before_flush')
+def _track_user_writes(session, flush_context, instances):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            session.info.setdefault('identity_users', set()).add(obj.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop('identity_users', ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('identity_users', None)
@@ -0,0 +1,312 @@
+"""
+Streaming catalog importer
+Reads tools from a JSONL or CSV file and upserts them in batches keyed by
+(platform, name). Only one batch is held in memory at a time.
+
+    flask import-tools data/tools.jsonl
+    flask import-tools catalog.csv --batch-size 5000
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, text
+from database import db, Tool
+from catalog import bump_catalog_version
+from conditional import bump_content_version_now
+from search import ensure_search_index
+
+KEY = ('platform', 'name')
+REQUIRED = ('name', 'platform', 'category', 'subcategory', 'description', 'difficulty')
+OPTIONAL = ('command', 'documentation_url', 'github_url', 'downloads', 'is_verified')
+FIELDS = REQUIRED + OPTIONAL
+
+# Column defaults for new rows, matching the Tool model
+INSERT_DEFAULTS = {'command': '', 'downloads': 0, 'is_verified': False}
+
+MAX_WARNINGS = 20
+
+class CatalogRowError(ValueError):
+    """A catalog row that cannot be imported"""
+
+# ==================== READING ====================
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 't')
+
+def clean_row(raw):
+    """Normalize one input record; absent or empty fields are left out"""
+    row = {}
+    for field in FIELDS:
+        value = raw.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            continue
+        row[field] = value
+
+    missing = [field for field in KEY if field not in row]
+    if missing:
+        raise CatalogRowError(f'missing {", ".join(missing)}')
+    if 'difficulty' in row:
+        row['difficulty'] = str(row['difficulty']).lower()
+    if 'is_verified' in row:
+        row['is_verified'] = _parse_bool(row['is_verified'])
+    if 'downloads' in row:
+        try:
+            row['downloads'] = int(row['downloads'])
+        except (TypeError, ValueError):
+            raise CatalogRowError(f'downloads is not an integer: {row["downloads"]!r}')
+    return row
+
+def read_rows(stream, fmt):
+    """Yield (line number, record) from a JSONL or CSV text stream.
+
+    Unparseable lines are yielded as CatalogRowError instead of a dict.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, CatalogRowError(f'invalid JSON: {e}')
+            continue
+        yield number, record if isinstance(record, dict) else CatalogRowError('not a JSON object')
+
+def detect_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+# ==================== WRITING ====================
+
+def _upsert_mappings(rows):
+    """Bulk insert new keys and bulk update changed ones.
+
+    Returns (inserted, updated, rejected keys).
+    """
+    # Look up by name alone: SQLite scans for row-value IN, but seeks ix_tools_name_id.
+    # Same-named tools on other platforms come back too and are ignored.
+    columns = [Tool.id] + [getattr(Tool, field) for field in FIELDS]
+    result = db.session.execute(
+        select(*columns).where(Tool.name.in_({name for _, name in rows})))
+    existing = {(record['platform'], record['name']): record for record in result.mappings()}
+
+    now = datetime.utcnow()
+    inserts, updates, rejected = [], [], []
+    for key, row in rows.items():
+        current = existing.get(key)
+        if current is None:
+            if any(field not in row for field in REQUIRED):
+                rejected.append(key)
+                continue
+            inserts.append(dict(INSERT_DEFAULTS, **row, created_at=now, updated_at=now))
+        elif any(current[field] != value for field, value in row.items()):
+            updates.append(dict(row, id=current['id'], updated_at=now))
+
+    if inserts:
+        db.session.bulk_insert_mappings(Tool, inserts)
+    if updates:
+        db.session.bulk_update_mappings(Tool, updates)
+    return len(inserts), len(updates), rejected
+
+# PostgreSQL: COPY each batch into a staging table, then upsert set-wise
+POSTGRES_STAGING = """
+    CREATE TEMP TABLE IF NOT EXISTS tools_import (
+        name varchar(200), platform varchar(50), category varchar(100),
+        subcategory varchar(100), description text, difficulty varchar(20),
+        command text, documentation_url varchar(500), github_url varchar(500),
+        downloads integer, is_verified boolean
+    ) ON COMMIT DELETE ROWS
+"""
+
+POSTGRES_COPY = f"COPY tools_import ({', '.join(FIELDS)}) FROM STDIN WITH (FORMAT csv)"
+
+POSTGRES_UPDATE = """
+    UPDATE tools t SET
+        category = coalesce(s.category, t.category),
+        subcategory = coalesce(s.subcategory, t.subcategory),
+        description = coalesce(s.description, t.description),
+        difficulty = coalesce(s.difficulty, t.difficulty),
+        command = coalesce(s.command, t.command),
+        documentation_url = coalesce(s.documentation_url, t.documentation_url),
+        github_url = coalesce(s.github_url, t.github_url),
+        downloads = coalesce(s.downloads, t.downloads),
+        is_verified = coalesce(s.is_verified, t.is_verified),
+        updated_at = timezone('utc', now())
+    FROM tools_import s
+    WHERE t.platform = s.platform AND t.name = s.name
+      AND ROW(t.category, t.subcategory, t.description, t.difficulty, t.command,
+              t.documentation_url, t.github_url, t.downloads, t.is_verified)
+          IS DISTINCT FROM
+          ROW(coalesce(s.category, t.category), coalesce(s.subcategory, t.subcategory),
+              coalesce(s.description, t.description), coalesce(s.difficulty, t.difficulty),
+              coalesce(s.command, t.command), coalesce(s.documentation_url, t.documentation_url),
+              coalesce(s.github_url, t.github_url), coalesce(s.downloads, t.downloads),
+              coalesce(s.is_verified, t.is_verified))
+"""
+
+POSTGRES_NEW = """
+    NOT EXISTS (SELECT 1 FROM tools t WHERE t.platform = s.platform AND t.name = s.name)
+"""
+
+POSTGRES_REJECTED = f"""
+    SELECT s.platform, s.name FROM tools_import s
+    WHERE {POSTGRES_NEW}
+      AND (s.category IS NULL OR s.subcategory IS NULL
+           OR s.description IS NULL OR s.difficulty IS NULL)
+"""
+
+POSTGRES_INSERT = f"""
+    INSERT INTO tools (name, platform, category, subcategory, description, difficulty,
+                       command, documentation_url, github_url, downloads, is_verified,
+                       created_at, updated_at)
+    SELECT s.name, s.platform, s.category, s.subcategory, s.description, s.difficulty,
+           coalesce(s.command, ''), s.documentation_url, s.github_url,
+           coalesce(s.downloads, 0), coalesce(s.is_verified, false),
+           timezone('utc', now()), timezone('utc', now())
+    FROM tools_import s
+    WHERE {POSTGRES_NEW}
+      AND s.category IS NOT NULL AND s.subcategory IS NOT NULL
+      AND s.description IS NOT NULL AND s.difficulty IS NOT NULL
+"""
+
+def _copy_supported():
+    dialect = db.engine.dialect
+    return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+
+def _copy_value(value):
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value  # None is written as an empty, unquoted field: NULL
+
+def _upsert_copy(rows):
+    """COPY the batch into tools_import and upsert from there.
+
+    Returns (inserted, updated, rejected keys).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows.values():
+        writer.writerow([_copy_value(row.get(field)) for field in FIELDS])
+    buffer.seek(0)
+
+    db.session.execute(text(POSTGRES_STAGING))
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(POSTGRES_COPY, buffer)
+    finally:
+        cursor.close()
+
+    updated = db.session.execute(text(POSTGRES_UPDATE)).rowcount
+    rejected = [tuple(key) for key in db.session.execute(text(POSTGRES_REJECTED))]
+    inserted = db.session.execute(text(POSTGRES_INSERT)).rowcount
+    return inserted, updated, rejected
+
+# ==================== IMPORT ====================
+
+def import_tools(stream, fmt='jsonl', batch_size=1000, use_copy=True, log=print):
+    """Upsert every tool in stream; returns counts and throughput.
+
+    Rows are keyed by (platform, name); a later row for the same key wins
+    for the fields it sets. Fields a row leaves out keep their stored (or
+    earlier given) value, whatever the batch size.
+    """
+    upsert = _upsert_copy if use_copy and _copy_supported() else _upsert_mappings
+    stats = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'skipped': 0}
+    warnings = []
+    batch = {}
+    started = last_log = time.perf_counter()
+
+    def warn(message):
+        stats['skipped'] += 1
+        if len(warnings) < MAX_WARNINGS:
+            warnings.append(message)
+            log(f'skipped {message}')
+
+    def flush():
+        nonlocal last_log
+        inserted, updated, rejected = upsert(batch)
+        db.session.commit()
+        for platform, name in rejected:
+            warn(f'{name!r} ({platform}): new tool needs {", ".join(REQUIRED)}')
+        stats['inserted'] += inserted
+        stats['updated'] += updated
+        stats['unchanged'] += len(batch) - inserted - updated - len(rejected)
+        batch.clear()
+
+        now = time.perf_counter()
+        if now - last_log >= 1:
+            last_log = now
+            log(f'{stats["rows"]:,} rows ({stats["rows"] / (now - started):,.0f} rows/s)')
+
+    try:
+        for number, record in read_rows(stream, fmt):
+            stats['rows'] += 1
+            try:
+                if isinstance(record, CatalogRowError):
+                    raise record
+                row = clean_row(record)
+            except CatalogRowError as e:
+                warn(f'line {number}: {e}')
+                continue
+
+            key = (row['platform'], row['name'])
+            if key in batch:
+                stats['duplicates'] += 1
+            batch[key] = {**batch[key], **row} if key in batch else row
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        # Committed batches are visible even if a later one failed
+        if stats['inserted'] or stats['updated']:
+            bump_content_version_now('tools')
+            bump_catalog_version(None)
+
+    seconds = time.perf_counter() - started
+    stats['seconds'] = round(seconds, 3)
+    stats['rows_per_second'] = round(stats['rows'] / seconds) if seconds else None
+    if stats['skipped'] > len(warnings):
+        log(f'... {stats["skipped"] - len(warnings)} more rows skipped')
+    return stats
+
+@click.command('import-tools')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']),
+              help='file format (default: from the extension; JSONL for stdin)')
+@click.option('--batch-size', default=1000, show_default=True, help='rows per upsert transaction')
+@click.option('--no-copy', is_flag=True, help='use bulk mappings even on PostgreSQL')
+@with_appcontext
+def import_tools_command(path, fmt, batch_size, no_copy):
+    """Upsert tools from a JSONL or CSV catalog file."""
+    db.create_all()
+    ensure_search_index()
+
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+    try:
+        stats = import_tools(stream, fmt or detect_format(path), batch_size,
+                             use_copy=not no_copy, log=lambda message: click.echo(message, err=True))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    click.echo(f'{stats["rows"]:,} rows in {stats["seconds"]:.1f}s '
+               f'({stats["rows_per_second"] or 0:,} rows/s): '
+               f'{stats["inserted"]:,} inserted, {stats["updated"]:,} updated, '
+               f'{stats["unchanged"]:,} unchanged, {stats["duplicates"]:,} duplicates, '
+               f'{stats["skipped"]:,} skipped')
@@ -0,0 +1,317 @@
+"""
+Prometheus metrics
+Per-endpoint request latency, SQL statement count and time, template render
+time and response size are aggregated in-process and served at /metrics in
+the Prometheus text format. With METRICS_DIR set, each worker writes its
+totals to a file there and whichever worker is scraped merges them all, so
+a gunicorn deployment reports one set of series. Clear METRICS_DIR when the
+server starts.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import before_render_template, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from fragments import fragment_cache
+from hashing import password_hasher
+from identity import user_cache_stats
+
+PREFIX = 'hackerhub_'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name -> (type, help, buckets)
+DEFINITIONS = {
+    'http_requests_total': ('counter', 'Requests handled, by endpoint, method and status', None),
+    'http_request_duration_seconds': ('histogram', 'Request latency', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', 'Response body size', SIZE_BUCKETS),
+    'db_queries_per_request': ('histogram', 'SQL statements executed per request', QUERY_BUCKETS),
+    'db_queries_total': ('counter', 'SQL statements executed', None),
+    'db_query_seconds_total': ('counter', 'Time spent executing SQL statements', None),
+    'template_render_seconds_total': ('counter', 'Time spent rendering templates', None),
+    'password_hashes_total': ('counter', 'Password hashes and checks computed', None),
+    'password_hash_rejected_total': ('counter', 'Password hashes refused because the pool was busy', None),
+    'password_hash_seconds_total': ('counter', 'Time spent in the password KDF', None),
+    'password_hash_wait_seconds_total': ('counter', 'Time spent waiting for a hashing slot', None),
+    'cache_hits_total': ('counter', 'In-process cache hits', None),
+    'cache_misses_total': ('counter', 'In-process cache misses', None),
+    'cache_evictions_total': ('counter', 'In-process cache evictions', None),
+    'cache_entries': ('gauge', 'Entries held by in-process caches', None),
+    'cache_bytes': ('gauge', 'Approximate bytes held by in-process caches', None),
+    'startup_seconds': ('gauge', 'Cold-start time of the worker, by phase', None),
+}
+
+# [statements, db seconds, render seconds, render started, status, size] for the current request
+_current = ContextVar('request_metrics', default=None)
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+# ==================== INSTRUMENTATION ====================
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    state = _current.get()
+    started = getattr(context, '_metrics_started', None)
+    if state is not None and started is not None:
+        state[0] += 1
+        state[1] += time.perf_counter() - started
+
+def _before_render(sender, template, context, **extra):
+    state = _current.get()
+    if state is not None:
+        state[3] = time.perf_counter()
+
+def _after_render(sender, template, context, **extra):
+    state = _current.get()
+    if state is not None and state[3] is not None:
+        state[2] += time.perf_counter() - state[3]
+        state[3] = None
+
+class Metrics:
+    """Per-process aggregates plus the /metrics endpoint"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.directory = None
+        self.interval = 5
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.directory = app.config.get('METRICS_DIR') or None
+        self.interval = app.config.get('METRICS_FLUSH_INTERVAL', self.interval)
+        app.extensions['metrics'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._finish_request)
+        before_render_template.connect(_before_render, app)
+        template_rendered.connect(_after_render, app)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)
+
+    # ==================== RECORDING ====================
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = DEFINITIONS[name][2]
+        key = (name, labels)
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(buckets) + 2)
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+
+    def _start_request(self):
+        if self.directory:
+            self._ensure_worker()
+        request.environ['metrics.started'] = time.perf_counter()
+        request.environ['metrics.token'] = _current.set([0, 0.0, 0.0, None, None, None])
+
+    def _finish_response(self, response):
+        state = _current.get()
+        if state is not None:
+            state[4] = response.status_code
+            state[5] = None if response.is_streamed else response.content_length
+        return response
+
+    def _finish_request(self, exc=None):
+        started = request.environ.pop('metrics.started', None)
+        token = request.environ.pop('metrics.token', None)
+        if started is None:
+            return
+        state = _current.get()
+        _current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        endpoint = request.endpoint or 'none'
+        statements, db_seconds, render_seconds, _, status, size = state
+        if status is None:
+            status = 500
+        self.inc('http_requests_total', _labels(endpoint=endpoint, method=request.method, status=str(status)))
+        route = _labels(endpoint=endpoint)
+        self.observe('http_request_duration_seconds', route, elapsed)
+        if size is not None:
+            self.observe('http_response_size_bytes', route, size)
+        self.observe('db_queries_per_request', route, statements)
+        self.inc('db_queries_total', route, statements)
+        self.inc('db_query_seconds_total', route, db_seconds)
+        self.inc('template_render_seconds_total', route, render_seconds)
+
+    # ==================== COLLECTION ====================
+
+    def _process_samples(self):
+        """Totals kept by other components, folded in as (kind, name, labels, value)"""
+        hashing = password_hasher.stats()
+        yield 'counter', 'password_hashes_total', (), hashing['hashes']
+        yield 'counter', 'password_hash_rejected_total', (), hashing['rejected']
+        yield 'counter', 'password_hash_seconds_total', (), hashing['hash_seconds_total']
+        yield 'counter', 'password_hash_wait_seconds_total', (), hashing['wait_seconds_total']
+
+        for cache, stats in (('fragments', fragment_cache.stats()), ('users', user_cache_stats())):
+            labels = _labels(cache=cache)
+            yield 'counter', 'cache_hits_total', labels, stats['hits']
+            yield 'counter', 'cache_misses_total', labels, stats['misses']
+            yield 'counter', 'cache_evictions_total', labels, stats['evictions']
+            yield 'gauge', 'cache_entries', labels, stats['entries']
+            yield 'gauge', 'cache_bytes', labels, stats['bytes']
+
+        startup = self.app.extensions.get('startup')
+        if startup:
+            for phase in ('import', 'create_app', 'total'):
+                yield 'gauge', 'startup_seconds', _labels(phase=phase), round(startup[f'{phase}_ms'] / 1000, 4)
+
+    def snapshot(self):
+        """This process's series, in a JSON-friendly shape"""
+        with self._lock:
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, labels, counts[:]] for (name, labels), counts in self._histograms.items()]
+        gauges = []
+        for kind, name, labels, value in self._process_samples():
+            (counters if kind == 'counter' else gauges).append([name, labels, value])
+        return {'pid': os.getpid(), 'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (atomically)"""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _snapshots(self):
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # being replaced or truncated; picked up next scrape
+        return snapshots
+
+    def collect(self):
+        """Merge every worker's snapshot: counters and histograms are summed,
+        gauges are kept per live pid"""
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.get(key)
+                histograms[key] = counts if merged is None else [a + b for a, b in zip(merged, counts)]
+            if _alive(snapshot['pid']):
+                for name, labels, value in snapshot['gauges']:
+                    key = (name, tuple(map(tuple, labels)) + (('pid', str(snapshot['pid'])),))
+                    gauges[key] = value
+        return counters, gauges, histograms
+
+    def render(self):
+        """Prometheus text exposition format, version 0.0.4"""
+        counters, gauges, histograms = self.collect()
+        by_name = {}
+        for values in (counters, gauges):
+            for (name, labels), value in values.items():
+                by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), counts in histograms.items():
+            by_name.setdefault(name, []).append((labels, counts))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text, buckets = DEFINITIONS[name]
+            full = PREFIX + name
+            lines.append(f'# HELP {full} {help_text}')
+            lines.append(f'# TYPE {full} {kind}')
+            for labels, value in sorted(by_name[name]):
+                if kind != 'histogram':
+                    lines.append(f'{full}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), value):
+                    cumulative += count
+                    le = _format_value(bound) if bound != '+Inf' else bound
+                    lines.append(f'{full}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{full}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{full}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def view(self):
+        return self.app.response_class(self.render(), mimetype='text/plain; version=0.0.4')
+
+    # ==================== WRITER ====================
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+        thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('Writing metrics failed')
+
+def _alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+metrics = Metrics()
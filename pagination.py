@@ -0,0 +1,160 @@
+"""
+Keyset (cursor) pagination
+Pages seek on an ordered, unique key instead of OFFSET, so deep pages
+cost the same as the first one. Cursors are opaque url-safe tokens.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import tuple_
+from cache import LRUCache
+
+_totals = LRUCache(maxsize=2048)
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+# Seek values a cursor may carry; anything else is a tampered cursor
+CURSOR_SCALARS = (str, int, float, type(None))
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if set(value) != {'dt'} or not isinstance(value['dt'], str):
+            raise ValueError('bad cursor value')
+        return datetime.fromisoformat(value['dt'])
+    if isinstance(value, bool) or not isinstance(value, CURSOR_SCALARS):
+        raise ValueError('bad cursor value')
+    return value
+
+def encode_cursor(values, direction='next'):
+    payload = json.dumps({'k': [_encode_value(v) for v in values], 'd': direction},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (values, direction); a missing or malformed cursor means the first page"""
+    if not cursor:
+        return None, 'next'
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload['k'], list):
+            return None, 'next'
+        values = [_decode_value(v) for v in payload['k']]
+        direction = 'prev' if payload.get('d') == 'prev' else 'next'
+        return values, direction
+    except (ValueError, KeyError, TypeError, AttributeError, binascii.Error):
+        return None, 'next'
+
+class KeysetPage:
+    """One page of results, with the same basic fields as a Pagination"""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+class FrozenPagination(Pagination):
+    """Page-number result holding plain items, detached from its query"""
+
+    def __init__(self, page, items):
+        self._frozen = (items, page.total)
+        super().__init__(page=page.page, per_page=page.per_page, max_per_page=None, error_out=False)
+
+    def _query_items(self):
+        return self._frozen[0]
+
+    def _query_count(self):
+        return self._frozen[1]
+
+def freeze_page(page, convert):
+    """Copy of a KeysetPage or Pagination with convert(item) items, safe to cache"""
+    items = [convert(item) for item in page.items]
+    if isinstance(page, KeysetPage):
+        return KeysetPage(items, page.per_page, page.next_cursor, page.prev_cursor, page.total)
+    return FrozenPagination(page, items)
+
+def _cached_total(query, ttl):
+    compiled = query.statement.compile()
+    key = (str(compiled), tuple(sorted(compiled.params.items())))
+    total = _totals.get(key)
+    if total is None:
+        total = query.order_by(None).count()
+        _totals.set(key, total, ttl=ttl)
+    return total
+
+def _fits(columns, values):
+    """Whether decoded cursor values can seek on columns (count and types)"""
+    if len(values) != len(columns):
+        return False
+    for column, value in zip(columns, values):
+        try:
+            expected = column.type.python_type
+        except NotImplementedError:
+            continue
+        if expected is float:
+            expected = (int, float)
+        if value is not None and not isinstance(value, expected):
+            return False
+    return True
+
+def paginate_keyset(query, order, cursor=None, per_page=20, count_ttl=None):
+    """Paginate query by order, a list of (column, descending) ending in a unique column.
+
+    All columns must sort in the same direction. The total is only
+    counted when count_ttl is given, and then cached for that many seconds.
+    """
+    columns = [column for column, _ in order]
+    descending = order[0][1]
+    values, direction = decode_cursor(cursor)
+    if values is not None and not _fits(columns, values):
+        values, direction = None, 'next'
+    backwards = direction == 'prev'
+
+    page_query = query.order_by(None)
+    if values is not None:
+        key, seek = tuple_(*columns), tuple_(*values)
+        if descending != backwards:
+            page_query = page_query.filter(key < seek)
+        else:
+            page_query = page_query.filter(key > seek)
+
+    reverse = descending != backwards
+    page_query = page_query.order_by(*[column.desc() if reverse else column.asc() for column in columns])
+
+    rows = page_query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def key_of(item):
+        return [getattr(item, column.key) for column in columns]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more if not backwards else True:
+            next_cursor = encode_cursor(key_of(rows[-1]), 'next')
+        if has_more if backwards else values is not None:
+            prev_cursor = encode_cursor(key_of(rows[0]), 'prev')
+
+    total = _cached_total(query, count_ttl) if count_ttl is not None else None
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor, total)
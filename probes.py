@@ -0,0 +1,108 @@
+"""
+Health probes and row counts
+/livez never touches the database and /readyz runs a single pooled
+SELECT 1. Table sizes come from a snapshot refreshed on a background
+thread, read from the planner's estimates on PostgreSQL, so no probe
+ever pays for COUNT(*).
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, func, select, text
+from database import db, User, Tool, Post
+
+COUNTED = {'users': User, 'tools': Tool, 'posts': Post}
+
+def ping_database():
+    """Round-trip one SELECT 1 on a pooled connection; returns milliseconds"""
+    started = time.perf_counter()
+    with db.engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    return round((time.perf_counter() - started) * 1000, 2)
+
+def _estimated_counts():
+    """reltuples from pg_class; None for tables never analyzed"""
+    names = {model.__tablename__: key for key, model in COUNTED.items()}
+    rows = db.session.execute(
+        text('SELECT relname, reltuples FROM pg_class WHERE relkind = :kind AND relname IN :names '
+             'AND pg_table_is_visible(oid)')
+        .bindparams(bindparam('names', expanding=True)),
+        {'kind': 'r', 'names': list(names)}).all()
+    counts = dict.fromkeys(COUNTED)
+    for relname, reltuples in rows:
+        if reltuples >= 0:
+            counts[names[relname]] = int(reltuples)
+    return counts
+
+def count_rows():
+    """{'users': n, 'tools': n, 'posts': n}, estimated where the database can"""
+    counts = dict.fromkeys(COUNTED)
+    estimated = db.engine.dialect.name == 'postgresql'
+    if estimated:
+        counts = _estimated_counts()
+    for key, model in COUNTED.items():
+        if counts[key] is None:
+            counts[key] = db.session.execute(select(func.count()).select_from(model)).scalar()
+    return counts, estimated
+
+class RowCounts:
+    """Row-count snapshot kept fresh by a daemon thread per process"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 60
+        self._snapshot = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('ROW_COUNT_REFRESH_INTERVAL', self.interval)
+        app.extensions['row_counts'] = self
+        if self.interval:
+            # Started from a request so forking servers get one per worker
+            app.before_request(self._ensure_worker)
+
+    def refresh(self):
+        with self.app.app_context():
+            started = time.perf_counter()
+            counts, estimated = count_rows()
+            self._snapshot = {
+                'counts': counts,
+                'estimated': estimated,
+                'refreshed_at': datetime.utcnow().isoformat(),
+                'refresh_ms': round((time.perf_counter() - started) * 1000, 2),
+            }
+            db.session.remove()
+        return self._snapshot
+
+    def snapshot(self):
+        """Latest counts; the first call in a process computes them inline"""
+        return self._snapshot or self.refresh()
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+        thread = threading.Thread(target=self._run, name='row-counts', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            # Jittered so workers do not all count at the same moment
+            time.sleep(self.interval * random.uniform(0.8, 1.2))
+            try:
+                self.refresh()
+            except Exception:
+                self.app.logger.exception('Row count refresh failed')
+
+row_counts = RowCounts()
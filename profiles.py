@@ -0,0 +1,62 @@
+"""
+Recommendation profile scoring
+How well a tool's difficulty suits an experience level and whether a user's
+resources can run its platform. Plain data and functions with no app
+imports, shared by the web recommender and the hub.py console.
+"""
+
+DIFFICULTIES = ('beginner', 'intermediate', 'advanced')
+
+# experience -> fit for each difficulty, in DIFFICULTIES order
+LEVEL_FIT = {
+    'beginner': (1.0, 0.35, 0.0),
+    'intermediate': (0.7, 1.0, 0.35),
+    'advanced': (0.4, 0.8, 1.0),
+    'elite': (0.25, 0.6, 1.0),
+}
+
+# resource -> words in a platform name it can run
+RESOURCE_PLATFORMS = {
+    'phone': ('phone', 'android', 'ios'),
+    'pc/laptop': ('linux', 'windows', 'web'),
+    'hacking lab': ('linux',),
+    'dedicated linux machine': ('linux',),
+    'cloud resources': ('web',),
+}
+
+def experience_key(experience):
+    """Known experience level for experience (unknown levels count as beginner)"""
+    experience = (experience or '').lower()
+    return experience if experience in LEVEL_FIT else 'beginner'
+
+def level_fit(experience):
+    """Fit per difficulty for an experience level (unknown levels count as beginner)"""
+    return LEVEL_FIT[experience_key(experience)]
+
+def difficulty_rank(difficulty):
+    difficulty = (difficulty or '').lower()
+    return DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0
+
+def resource_key(resources):
+    """Normalized, hashable form of a user's resource list.
+
+    Only known resources are kept, so there are at most
+    2 ** len(RESOURCE_PLATFORMS) keys whatever users submit.
+    """
+    resources = {str(resource).lower() for resource in resources or ()}
+    if 'all resources' in resources:
+        return tuple(sorted(RESOURCE_PLATFORMS))
+    return tuple(sorted(resources & RESOURCE_PLATFORMS.keys()))
+
+def platform_fit(platform, resources):
+    """1.0 if one of the resources (a resource_key) can run platform, else 0.0.
+
+    Users who have not picked any resources are not filtered by them.
+    """
+    if not resources:
+        return 1.0
+    platform = platform.lower()
+    for resource in resources:
+        if any(word in platform for word in RESOURCE_PLATFORMS.get(resource, ())):
+            return 1.0
+    return 0.0
@@ -0,0 +1,106 @@
+"""
+Query budgets
+Counts the SQL statements each request executes and logs (or, with
+QUERY_BUDGET_RAISE, fails) requests that go over QUERY_BUDGET, naming the
+most repeated statement so an N+1 is easy to spot. assert_max_queries does
+the same for a block of code in tests:
+
+    with assert_max_queries(3):
+        client.get('/my-tools')
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statement lists of every counter active in this context, outermost first
+_active = ContextVar('query_budget', default=())
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, statements, limit, where='block'):
+        self.statements = statements
+        self.limit = limit
+        statement, repeats = Counter(statements).most_common(1)[0]
+        super().__init__(f'{where} ran {len(statements)} SQL statements (budget {limit}); '
+                         f'most repeated ({repeats}x): {statement}')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for statements in _active.get():
+        statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Collect the statements executed inside the block into the yielded list"""
+    statements = []
+    token = _active.set(_active.get() + (statements,))
+    try:
+        yield statements
+    finally:
+        _active.reset(token)
+
+@contextmanager
+def assert_max_queries(limit):
+    """Raise QueryBudgetExceeded if the block executes more than limit statements"""
+    with count_queries() as statements:
+        yield statements
+    if len(statements) > limit:
+        raise QueryBudgetExceeded(statements, limit)
+
+@contextmanager
+def unbudgeted():
+    """Leave the statements in the block out of every active count (one-off setup work)"""
+    token = _active.set(())
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+def query_budget(limit):
+    """Per-view budget, overriding QUERY_BUDGET"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+class QueryBudget:
+    """Checks every request against its query budget"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['query_budget'] = self
+        if app.config.get('QUERY_BUDGET'):
+            app.before_request(self._start_request)
+            app.after_request(self._check_request)
+            app.teardown_request(self._end_request)
+
+    def _start_request(self):
+        statements = request.environ['query_budget.statements'] = []
+        request.environ['query_budget.token'] = _active.set(_active.get() + (statements,))
+
+    def _check_request(self, response):
+        statements = request.environ.get('query_budget.statements')
+        if statements is None:
+            return response
+        view = current_app.view_functions.get(request.endpoint)
+        limit = getattr(view, 'query_budget', current_app.config['QUERY_BUDGET'])
+        if len(statements) > limit:
+            error = QueryBudgetExceeded(statements, limit, where=f'{request.method} {request.path}')
+            if current_app.config.get('QUERY_BUDGET_RAISE'):
+                raise error
+            current_app.logger.warning('%s', error)
+        return response
+
+    def _end_request(self, exc=None):
+        request.environ.pop('query_budget.statements', None)
+        token = request.environ.pop('query_budget.token', None)
+        if token is not None:
+            _active.reset(token)
+
+query_budget_guard = QueryBudget()
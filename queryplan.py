@@ -0,0 +1,123 @@
+"""
+Hot query registry and EXPLAIN command
+Every query on a hot path is registered here with representative
+parameters, so `flask explain-queries` shows its plan and a full
+scan stands out in review.
+"""
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from database import db, Tool, UserTool, Post, Comment, CTFChallenge, RelatedTool
+
+HOT_QUERIES = {}
+
+def hot_query(name):
+    """Register a function returning a Query or Select under name"""
+    def decorator(func):
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+# ==================== TOOLS ====================
+
+@hot_query('tools.list')
+def _tools_list():
+    return Tool.query.order_by(Tool.name, Tool.id).limit(21)
+
+@hot_query('tools.list_by_platform')
+def _tools_by_platform():
+    return Tool.query.filter_by(platform='Linux').order_by(Tool.name, Tool.id).limit(21)
+
+@hot_query('tools.list_by_platform_category')
+def _tools_by_platform_category():
+    return (Tool.query.filter_by(platform='Linux', category='Forensics')
+            .order_by(Tool.name, Tool.id).limit(21))
+
+@hot_query('tools.list_by_category')
+def _tools_by_category():
+    return Tool.query.filter_by(category='Forensics').order_by(Tool.name, Tool.id).limit(21)
+
+@hot_query('tools.list_by_difficulty')
+def _tools_by_difficulty():
+    return Tool.query.filter_by(difficulty='beginner').order_by(Tool.name, Tool.id).limit(21)
+
+@hot_query('tools.related')
+def _tools_related():
+    return (Tool.query.join(RelatedTool, RelatedTool.related_id == Tool.id)
+            .filter(RelatedTool.tool_id == 1).order_by(RelatedTool.rank).limit(4))
+
+@hot_query('tools.verified_ids')
+def _tools_verified_ids():
+    return db.session.query(Tool.id).filter_by(is_verified=True).order_by(Tool.id)
+
+@hot_query('tools.recent')
+def _tools_recent():
+    return Tool.query.order_by(Tool.created_at.desc()).limit(5)
+
+@hot_query('tools.changed_since')
+def _tools_changed_since():
+    return db.session.query(Tool.id).filter(Tool.updated_at >= '2024-01-01')
+
+# ==================== COMMUNITY ====================
+
+@hot_query('posts.feed')
+def _posts_feed():
+    return (Post.query.filter_by(is_locked=False)
+            .order_by(Post.created_at.desc(), Post.id.desc()).limit(11))
+
+@hot_query('posts.feed_by_type')
+def _posts_feed_by_type():
+    return (Post.query.filter_by(is_locked=False, post_type='tutorial')
+            .order_by(Post.created_at.desc(), Post.id.desc()).limit(11))
+
+@hot_query('posts.pinned')
+def _posts_pinned():
+    return Post.query.filter_by(is_pinned=True).order_by(Post.created_at.desc())
+
+@hot_query('comments.thread_roots')
+def _comments_thread_roots():
+    return Comment.query.filter(Comment.post_id == 1, Comment.parent_id.is_(None))
+
+@hot_query('comments.replies')
+def _comments_replies():
+    return Comment.query.filter(Comment.parent_id == 1)
+
+@hot_query('user_tools.by_user')
+def _user_tools_by_user():
+    return UserTool.query.filter_by(user_id=1)
+
+@hot_query('ctf.active')
+def _ctf_active():
+    return CTFChallenge.query.filter_by(is_active=True).order_by(CTFChallenge.difficulty)
+
+# ==================== EXPLAIN ====================
+
+def explain(query):
+    """Return (sql, plan lines) for a Query or Select on the current engine"""
+    statement = getattr(query, 'statement', query)
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        plan = [row[-1] for row in rows]
+    else:
+        rows = db.session.execute(text(f'EXPLAIN {sql}')).all()
+        plan = [row[0] for row in rows]
+    return sql, plan
+
+@click.command('explain-queries')
+@click.argument('names', nargs=-1)
+@with_appcontext
+def explain_queries_command(names):
+    """Print EXPLAIN output for registered hot queries."""
+    for name in names or sorted(HOT_QUERIES):
+        if name not in HOT_QUERIES:
+            raise click.BadParameter(f'unknown hot query {name!r}', param_hint='NAMES')
+        sql, plan = explain(HOT_QUERIES[name]())
+        click.echo(f'== {name}')
+        click.echo(' '.join(sql.split()))
+        for line in plan:
+            click.echo(f'   {line}')
+        click.echo()
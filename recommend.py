@@ -0,0 +1,144 @@
+"""
+Dashboard recommendations
+Every tool gets a score for a user from experience fit, whether their
+resources can run its platform, popularity, and similarity to the tools
+they follow (from the related_tools table).
+
+The first three only depend on the user's profile, so they are computed
+for the whole catalog in one pass per (experience, resources) and cached
+per catalog version, along with the best few hundred tools. Per user only
+the sparse follow-similarity is added, which can lift a tool but never
+lower one, so the top results are always among the profile's leaders plus
+the boosted tools.
+"""
+
+import heapq
+import math
+from array import array
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from cache import LRUCache
+from catalog import VersionedCache, catalog_version, tool_summary
+from database import db, Tool, UserTool, RelatedTool
+from profiles import difficulty_rank, experience_key, level_fit, platform_fit, resource_key
+
+WEIGHTS = {'level': 1.0, 'resources': 1.0, 'popularity': 0.4, 'similar': 1.5}
+
+# Leaders kept per profile; users following more tools than this fall back to a full pass
+PROFILE_DEPTH = 500
+
+# Profiles kept at once; each holds one score per tool
+PROFILE_CACHE_SIZE = 32
+
+_user_recommendations = LRUCache(maxsize=10000)
+
+def _build_catalog():
+    """Columnar view of the catalog: ids and their positions, difficulty rank, platform code, popularity"""
+    # Core rows and column-wise passes: this runs over the whole catalog
+    rows = db.session.connection().execute(
+        select(Tool.id, Tool.difficulty, Tool.platform, Tool.downloads).order_by(Tool.id)).all()
+    ids, difficulties, platform_names, downloads = zip(*rows) if rows else ((), (), (), ())
+    platforms = sorted(set(platform_names))
+    codes = {platform: code for code, platform in enumerate(platforms)}
+    ranks = {difficulty: difficulty_rank(difficulty) for difficulty in set(difficulties)}
+    top = math.log1p(max((n or 0 for n in downloads), default=0)) or 1.0
+    return {
+        'ids': array('l', ids),
+        'positions': {tool_id: i for i, tool_id in enumerate(ids)},
+        'levels': array('b', map(ranks.__getitem__, difficulties)),
+        'platforms': platforms,
+        'platform_codes': array('H', map(codes.__getitem__, platform_names)),
+        'popularity': array('d', (math.log1p(n or 0) / top for n in downloads)),
+    }
+
+_catalog = VersionedCache(_build_catalog)
+
+def _build_profile(experience, resources):
+    """Profile scores for every tool, plus the indices of the best PROFILE_DEPTH"""
+    catalog = _catalog.get()
+    level_scores = [WEIGHTS['level'] * fit for fit in level_fit(experience)]
+    platform_scores = [WEIGHTS['resources'] * platform_fit(platform, resources)
+                       for platform in catalog['platforms']]
+    popularity = WEIGHTS['popularity']
+    scores = array('d', (level_scores[level] + platform_scores[code] + popularity * pop
+                         for level, code, pop in zip(catalog['levels'], catalog['platform_codes'],
+                                                     catalog['popularity'])))
+    leaders = heapq.nlargest(PROFILE_DEPTH, range(len(scores)), key=scores.__getitem__)
+    # ids and positions are the catalog's own, shared by every profile
+    return {'ids': catalog['ids'], 'positions': catalog['positions'],
+            'scores': scores, 'leaders': leaders}
+
+_profiles = VersionedCache(_build_profile, maxsize=PROFILE_CACHE_SIZE)
+
+def _similar_scores(followed):
+    """{tool id: summed neighbor score} over the followed tools' related lists"""
+    if not followed:
+        return {}
+    rows = db.session.execute(
+        select(RelatedTool.related_id, func.sum(RelatedTool.score))
+        .where(RelatedTool.tool_id.in_(followed))
+        .group_by(RelatedTool.related_id)).all()
+    return {related_id: score for related_id, score in rows}
+
+def rank_tools(experience, resources, followed=(), limit=3):
+    """Ids of the best limit tools for a profile, excluding followed ones"""
+    profile = _profiles.get(experience_key(experience), resource_key(resources))
+    ids, scores, positions = profile['ids'], profile['scores'], profile['positions']
+    followed = set(followed)
+    similar = _similar_scores(followed)
+
+    # Followed tools may take up some of the leaders' places
+    needed = len(followed) + limit
+    leaders = profile['leaders']
+    if needed > len(leaders):
+        leaders = heapq.nlargest(needed, range(len(scores)), key=scores.__getitem__)
+    candidates = {ids[i]: scores[i] for i in leaders[:needed]}
+    for tool_id, score in similar.items():
+        i = positions.get(tool_id)
+        if i is not None:
+            candidates[tool_id] = scores[i] + WEIGHTS['similar'] * score
+    for tool_id in followed:
+        candidates.pop(tool_id, None)
+    return [tool_id for tool_id, _ in heapq.nlargest(limit, candidates.items(), key=lambda item: item[1])]
+
+def get_recommended_tools(user, limit=3):
+    """Tool summaries recommended for user, cached per user and catalog version"""
+    key = (catalog_version(), experience_key(user.experience),
+           resource_key(user.get_resources()), limit)
+    if user.id is not None:
+        cached = _user_recommendations.get(user.id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        followed = db.session.execute(
+            select(UserTool.tool_id).where(UserTool.user_id == user.id)).scalars().all()
+    else:
+        followed = ()  # session-only guest
+
+    ids = rank_tools(user.experience, user.get_resources(), followed, limit)
+    tools = {tool.id: tool for tool in Tool.query.filter(Tool.id.in_(ids))} if ids else {}
+    recommended = [tool_summary(tools[tool_id]) for tool_id in ids if tool_id in tools]
+    if user.id is not None:
+        _user_recommendations.set(user.id, (key, recommended),
+                                  ttl=current_app.config.get('CATALOG_CACHE_TTL'))
+    return recommended
+
+def invalidate_recommendations(user_id):
+    _user_recommendations.pop(user_id)
+
+# ==================== WRITE TRACKING ====================
+
+@event.listens_for(Session, 'before_flush')
+def _track_follow_writes(session, flush_context, instances):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, UserTool) and obj.user_id is not None:
+            session.info.setdefault('recommendation_users', set()).add(obj.user_id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop('recommendation_users', ()):
+        invalidate_recommendations(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('recommendation_users', None)
@@ -0,0 +1,111 @@
+"""
+Tool search backend
+SQLite FTS5 locally, tsvector/GIN on PostgreSQL
+"""
+
+import re
+from sqlalchemy import literal_column, text, false, or_
+from database import db, Tool
+
+# Column weights: name > category/subcategory > description
+SQLITE_WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tools_fts USING fts5(
+        name, category, subcategory, description,
+        content='tools', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_ai AFTER INSERT ON tools BEGIN
+        INSERT INTO tools_fts(rowid, name, category, subcategory, description)
+        VALUES (new.id, new.name, new.category, new.subcategory, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_ad AFTER DELETE ON tools BEGIN
+        INSERT INTO tools_fts(tools_fts, rowid, name, category, subcategory, description)
+        VALUES ('delete', old.id, old.name, old.category, old.subcategory, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_au
+    AFTER UPDATE OF name, category, subcategory, description ON tools BEGIN
+        INSERT INTO tools_fts(tools_fts, rowid, name, category, subcategory, description)
+        VALUES ('delete', old.id, old.name, old.category, old.subcategory, old.description);
+        INSERT INTO tools_fts(rowid, name, category, subcategory, description)
+        VALUES (new.id, new.name, new.category, new.subcategory, new.description);
+    END""",
+]
+
+# Expression index, so PostgreSQL maintains it on every insert/update by itself
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '') || ' ' || coalesce(subcategory, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_tools_search ON tools USING gin (({POSTGRES_VECTOR}))",
+]
+
+def _dialect():
+    return db.engine.dialect.name
+
+def _terms(text_query):
+    """Split user input into lowercase word tokens"""
+    return re.findall(r'\w+', (text_query or '').lower())
+
+def ensure_search_index(rebuild=False):
+    """Create the search index for the current backend (idempotent).
+
+    rebuild re-indexes every row, for tables refilled behind the triggers' back.
+    """
+    dialect = _dialect()
+
+    if dialect == 'sqlite':
+        exists = db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tools_fts'"
+        )).first()
+        for statement in SQLITE_DDL:
+            db.session.execute(text(statement))
+        if rebuild or not exists:
+            # Index rows the triggers never saw
+            db.session.execute(text("INSERT INTO tools_fts(tools_fts) VALUES ('rebuild')"))
+        db.session.commit()
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            db.session.execute(text(statement))
+        db.session.commit()
+
+def search_tools(query, text_query):
+    """Restrict a Tool query to matches for text_query, best match first"""
+    terms = _terms(text_query)
+    if not terms:
+        return query.filter(false())
+
+    dialect = _dialect()
+
+    if dialect == 'sqlite':
+        # Every term must match; the last one as a prefix for search-as-you-type
+        match = ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        fts = literal_column('tools_fts')
+        rank = db.func.bm25(fts, *SQLITE_WEIGHTS)
+        matches = (db.select(literal_column('tools_fts.rowid').label('tool_id'), rank.label('rank'))
+                   .select_from(text('tools_fts'))
+                   .where(fts.op('MATCH')(match))
+                   .subquery())
+        return (query.join(matches, matches.c.tool_id == Tool.id)
+                .order_by(matches.c.rank, Tool.name))
+
+    if dialect == 'postgresql':
+        vector = literal_column(f'({POSTGRES_VECTOR})')
+        # Same rule as SQLite: whole words, then a prefix for the last term
+        tsquery = db.func.to_tsquery('simple', ' & '.join(terms[:-1] + [f'{terms[-1]}:*']))
+        return (query.filter(vector.op('@@')(tsquery))
+                .order_by(db.func.ts_rank(vector, tsquery).desc(), Tool.name))
+
+    # Other backends: plain substring match, still ANDed per term
+    for term in terms:
+        pattern = f'%{term}%'
+        query = query.filter(or_(
+            Tool.name.ilike(pattern),
+            Tool.category.ilike(pattern),
+            Tool.subcategory.ilike(pattern),
+            Tool.description.ilike(pattern)
+        ))
+    return query.order_by(Tool.name)
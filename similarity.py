@@ -0,0 +1,217 @@
+"""
+Related tools
+An offline job scores every pair of tools by TF-IDF cosine over their text
+(name, description, category, subcategory, platform) blended with co-follow
+cosine from UserTool, and stores each tool's top K in related_tools, so
+tool_detail needs a single indexed lookup.
+
+Runs are incremental: a signature of each tool's text and followers is
+stored, and only tools whose signature changed, plus tools whose neighbor
+lists they can enter or leave, are recomputed. IDF weights drift slowly as
+the catalog grows; `flask related-tools --full` recomputes everything.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import time
+from collections import defaultdict
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, select
+from database import db, Tool, UserTool, RelatedTool, ToolSignature
+from conditional import bump_content_version_now
+
+STOPWORDS = frozenset('a an and are as at be by for from in into is it of on or the to with '
+                      'that this tool tools using use your you can'.split())
+
+COMMON_TERM_FRACTION = 0.2
+COMMON_TERM_MIN = 50
+
+def _tokens(tool):
+    words = [word for word in re.findall(r'\w+', f'{tool.name} {tool.name} {tool.description}'.lower())
+             if len(word) > 1 and word not in STOPWORDS]
+    # Structured fields count as whole features, not as loose words
+    words.append(f'category={tool.category.lower()}')
+    words.append(f'subcategory={tool.subcategory.lower()}')
+    words.append(f'platform={tool.platform.lower()}')
+    return words
+
+def _signature(tool, followers):
+    text = '\x1f'.join((tool.name, tool.description, tool.category, tool.subcategory, tool.platform))
+    follows = ','.join(map(str, sorted(followers)))
+    return hashlib.sha1(f'{text}\x1e{follows}'.encode()).hexdigest()
+
+class SimilarityIndex:
+    """Sparse TF-IDF vectors and follower sets for the whole catalog"""
+
+    def __init__(self, tools, follows):
+        self.ids = [tool.id for tool in tools]
+        self.followers = defaultdict(set)  # tool id -> user ids
+        self.follows = defaultdict(set)    # user id -> tool ids
+        for user_id, tool_id in follows:
+            self.followers[tool_id].add(user_id)
+            self.follows[user_id].add(tool_id)
+
+        counts = {tool.id: _term_counts(_tokens(tool)) for tool in tools}
+        document_frequency = defaultdict(int)
+        for terms in counts.values():
+            for term in terms:
+                document_frequency[term] += 1
+        total = len(tools)
+        idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in document_frequency.items()}
+        # Terms on a large share of the catalog say little and would make
+        # every lookup touch most tools; treat them as stopwords
+        common = max(COMMON_TERM_MIN, COMMON_TERM_FRACTION * total)
+        for terms in counts.values():
+            for term in [term for term in terms if document_frequency[term] > common]:
+                del terms[term]
+
+        # Unit-length vectors plus an inverted index, so one tool is scored
+        # against the catalog with a sparse product over its own terms
+        self.vectors = {}
+        self.postings = defaultdict(list)  # term -> [(tool id, weight)]
+        for tool_id, terms in counts.items():
+            weights = {term: (1 + math.log(n)) * idf[term] for term, n in terms.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            vector = {term: w / norm for term, w in weights.items()}
+            self.vectors[tool_id] = vector
+            for term, weight in vector.items():
+                self.postings[term].append((tool_id, weight))
+
+    def text_scores(self, tool_id):
+        scores = defaultdict(float)
+        for term, weight in self.vectors[tool_id].items():
+            for other, other_weight in self.postings[term]:
+                scores[other] += weight * other_weight
+        return scores
+
+    def cofollow_scores(self, tool_id):
+        followers = self.followers.get(tool_id)
+        if not followers:
+            return {}
+        shared = defaultdict(int)
+        for user_id in followers:
+            for other in self.follows[user_id]:
+                shared[other] += 1
+        return {other: n / math.sqrt(len(followers) * len(self.followers[other]))
+                for other, n in shared.items()}
+
+    def scores(self, tool_id, cofollow_weight):
+        """{other id: blended similarity} for every tool sharing a term or a follower"""
+        text = self.text_scores(tool_id)
+        cofollow = self.cofollow_scores(tool_id)
+        scores = {other: (1 - cofollow_weight) * score for other, score in text.items()}
+        for other, score in cofollow.items():
+            scores[other] = scores.get(other, 0.0) + cofollow_weight * score
+        scores.pop(tool_id, None)
+        return scores
+
+def _term_counts(words):
+    counts = defaultdict(int)
+    for word in words:
+        counts[word] += 1
+    return counts
+
+def _top(scores, k):
+    return heapq.nlargest(k, ((score, other) for other, score in scores.items() if score > 0))
+
+def refresh_related_tools(full=False, k=None, cofollow_weight=None, batch_size=500):
+    """Recompute stale neighbor lists; returns counts of what was done"""
+    config = current_app.config
+    k = k or config.get('RELATED_TOOLS_K', 8)
+    if cofollow_weight is None:
+        cofollow_weight = config.get('RELATED_TOOLS_COFOLLOW_WEIGHT', 0.3)
+    started = time.perf_counter()
+
+    tools = db.session.execute(select(Tool.id, Tool.name, Tool.description, Tool.category,
+                                      Tool.subcategory, Tool.platform)).all()
+    follows = db.session.execute(select(UserTool.user_id, UserTool.tool_id)).all()
+    index = SimilarityIndex(tools, follows)
+
+    signatures = {tool.id: _signature(tool, index.followers.get(tool.id, ())) for tool in tools}
+    stored = dict(db.session.execute(select(ToolSignature.tool_id, ToolSignature.signature)).all())
+    removed = set(stored) - set(signatures)
+    if full or not stored:
+        changed = set(signatures)
+    else:
+        changed = {tool_id for tool_id, signature in signatures.items() if stored.get(tool_id) != signature}
+
+    # Current lists, to find tools whose neighbors changed or may now be beaten
+    current = defaultdict(list)
+    for tool_id, related_id, score in db.session.execute(
+            select(RelatedTool.tool_id, RelatedTool.related_id, RelatedTool.score)
+            .order_by(RelatedTool.tool_id, RelatedTool.rank)):
+        current[tool_id].append((score, related_id))
+
+    if len(changed) == len(signatures):
+        results = {}  # everything is recomputed below; no need to hold all rows
+    else:
+        results = {tool_id: index.scores(tool_id, cofollow_weight) for tool_id in changed}
+    stale = set(changed)
+    touched = changed | removed
+    for tool_id in signatures:
+        if tool_id not in stale and any(related_id in touched for _, related_id in current.get(tool_id, ())):
+            stale.add(tool_id)
+
+    # Similarity is symmetric: a changed tool's row says where it now ranks
+    # in every other tool's list
+    for other in results:
+        for tool_id, score in results[other].items():
+            if tool_id in stale:
+                continue
+            neighbors = current.get(tool_id, ())
+            if score > (neighbors[-1][0] if len(neighbors) >= k else 0.0):
+                stale.add(tool_id)
+
+    stale = sorted(stale)
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        rows = []
+        for tool_id in batch:
+            scores = results.get(tool_id) or index.scores(tool_id, cofollow_weight)
+            rows.extend({'tool_id': tool_id, 'rank': rank, 'related_id': other, 'score': round(score, 6)}
+                        for rank, (score, other) in enumerate(_top(scores, k)))
+        db.session.execute(delete(RelatedTool).where(RelatedTool.tool_id.in_(batch)))
+        if rows:
+            db.session.execute(RelatedTool.__table__.insert(), rows)
+
+    if removed:
+        db.session.execute(delete(RelatedTool).where(RelatedTool.tool_id.in_(removed)))
+        db.session.execute(delete(ToolSignature).where(ToolSignature.tool_id.in_(removed)))
+    if changed:
+        db.session.execute(delete(ToolSignature).where(ToolSignature.tool_id.in_(changed)))
+        db.session.execute(ToolSignature.__table__.insert(),
+                           [{'tool_id': tool_id, 'signature': signatures[tool_id]} for tool_id in changed])
+    db.session.commit()
+
+    if stale or removed:
+        # Tool pages embed their related tools; let cached copies revalidate
+        bump_content_version_now('tools')
+
+    return {
+        'tools': len(signatures),
+        'changed': len(changed),
+        'removed': len(removed),
+        'recomputed': len(stale),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+def related_tool_ids(tool_id, limit=4):
+    """Ids of tool_id's precomputed neighbors, best first; empty until the job has run"""
+    return db.session.execute(
+        select(RelatedTool.related_id)
+        .where(RelatedTool.tool_id == tool_id)
+        .order_by(RelatedTool.rank)
+        .limit(limit)).scalars().all()
+
+@click.command('related-tools')
+@click.option('--full', is_flag=True, help='recompute every tool, not just changed ones')
+@with_appcontext
+def related_tools_command(full):
+    """Refresh the related-tools neighbor table."""
+    stats = refresh_related_tools(full=full)
+    click.echo('{recomputed} of {tools} tools recomputed ({changed} changed, {removed} removed) '
+               'in {seconds}s'.format(**stats))
@@ -0,0 +1,213 @@
+"""
+Catalog snapshot
+The whole catalog as one immutable, versioned value, shared by the tool
+read endpoints, the navigation context processor and (through
+`flask export-catalog`) the hub.py console. String columns use the
+catalogfile.py layout, so every distinct string is stored once; ids and
+flags are arrays, and the filter indexes are built with it.
+
+A new snapshot is built when the 'tools' content version moves on and is
+published by swapping one reference in app.extensions: readers never take
+a lock, and keep the snapshot they started with until their request ends.
+The database stays the source of truth; writes go through the ORM as
+before and only move the version. Download counts change too often to
+snapshot and are still read from the rows.
+"""
+
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from catalogfile import COLUMNS, CatalogFile, encode_catalog, write_catalog
+from conditional import content_versions
+from database import db, Tool
+from pagination import KeysetPage, decode_cursor, encode_cursor
+
+SNAPSHOT_COLUMNS = COLUMNS + ('command', 'documentation_url', 'github_url')
+FILTER_COLUMNS = ('platform', 'category', 'difficulty')
+
+# One tool as the read endpoints see it; attribute names match Tool's
+ToolRecord = namedtuple('ToolRecord', ('id',) + SNAPSHOT_COLUMNS + ('is_verified',))
+
+class CatalogSnapshot:
+    """Tools in (name, id) order, addressed by position"""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.built_at = time.time()
+        self.ids = array('l', (row.id for row in rows))
+        self.verified = array('B', (bool(row.is_verified) for row in rows))
+        self.data = CatalogFile(encode_catalog((row._mapping for row in rows), SNAPSHOT_COLUMNS))
+        self.positions = {tool_id: i for i, tool_id in enumerate(self.ids)}
+        self.verified_ids = array('l', sorted(tool_id for tool_id, flag in zip(self.ids, self.verified) if flag))
+
+        # column -> value -> positions, in listing order
+        self._index = {}
+        for column in FILTER_COLUMNS:
+            groups = {}
+            for i, string_id in enumerate(self.data.ids(column)):
+                groups.setdefault(string_id, array('I')).append(i)
+            self._index[column] = {self.data.string(string_id): positions
+                                   for string_id, positions in groups.items()}
+
+        pairs = {}
+        for platform_id, category_id in zip(self.data.ids('platform'), self.data.ids('category')):
+            pairs.setdefault(platform_id, set()).add(category_id)
+        self.taxonomy = {self.data.string(platform_id): sorted(map(self.data.string, category_ids))
+                         for platform_id, category_ids in sorted(pairs.items(),
+                                                                 key=lambda item: self.data.string(item[0]))}
+        self.platforms = list(self.taxonomy)
+        self.categories = sorted(self._index['category'])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def tool(self, i):
+        value = self.data.value
+        return ToolRecord(self.ids[i], *[value(column, i) for column in SNAPSHOT_COLUMNS],
+                          bool(self.verified[i]))
+
+    def get(self, tool_id):
+        i = self.positions.get(tool_id)
+        return None if i is None else self.tool(i)
+
+    def tools(self, tool_ids):
+        """Records for tool_ids in the given order, skipping unknown ids"""
+        positions = self.positions
+        return [self.tool(positions[tool_id]) for tool_id in tool_ids if tool_id in positions]
+
+    def filter(self, **filters):
+        """Positions of the tools whose columns equal the given values"""
+        filters = {column: value for column, value in filters.items() if value is not None}
+        if not filters:
+            return range(len(self))
+        # Walk the smallest index list and check the other columns per tool
+        column = min(filters, key=lambda c: len(self._index[c].get(filters[c], ())))
+        positions = self._index[column].get(filters.pop(column), array('I'))
+        if not filters:
+            return positions
+        value = self.data.value
+        return array('I', (i for i in positions
+                           if all(value(c, i) == v for c, v in filters.items())))
+
+    def alike(self, tool_id, limit=4):
+        """Other tools on the same platform and category, in listing order"""
+        i = self.positions.get(tool_id)
+        if i is None:
+            return []
+        positions = self.filter(platform=self.data.value('platform', i),
+                                category=self.data.value('category', i))
+        return [self.tool(j) for j in positions[:limit + 1] if j != i][:limit]
+
+    def _sort_key(self, i):
+        return (self.data.value('name', i), self.ids[i])
+
+    def paginate(self, positions, cursor=None, per_page=20):
+        """Keyset page of positions, with the same cursors as paginate_keyset on (name, id)"""
+        values, direction = decode_cursor(cursor)
+        if (values is None or len(values) != 2 or not isinstance(values[0], str)
+                or not isinstance(values[1], int)):
+            values, direction = None, 'next'
+        backwards = direction == 'prev'
+
+        if values is None:
+            start, stop = 0, per_page
+            has_more = len(positions) > per_page
+        elif backwards:
+            # Positions are ranks in (name, id) order, so the cursor's rank bounds the page
+            rank = bisect_left(range(len(self)), tuple(values), key=self._sort_key)
+            stop = bisect_left(positions, rank)
+            start = max(0, stop - per_page)
+            has_more = start > 0
+        else:
+            rank = bisect_right(range(len(self)), tuple(values), key=self._sort_key)
+            start = bisect_left(positions, rank)
+            stop = start + per_page
+            has_more = len(positions) > stop
+        items = [self.tool(i) for i in positions[start:stop]]
+
+        next_cursor = prev_cursor = None
+        if items:
+            if has_more if not backwards else True:
+                next_cursor = encode_cursor([items[-1].name, items[-1].id], 'next')
+            if has_more if backwards else values is not None:
+                prev_cursor = encode_cursor([items[0].name, items[0].id], 'prev')
+        return KeysetPage(items, per_page, next_cursor, prev_cursor, len(positions))
+
+    def records(self):
+        """Plain dicts in catalogfile.py COLUMNS, for the console's catalog file"""
+        for i in range(len(self)):
+            yield {column: self.data.value(column, i) for column in COLUMNS}
+
+    def stats(self):
+        return {'version': self.version, 'tools': len(self), 'built_at': self.built_at}
+
+# ==================== PUBLISHING ====================
+
+class _Published:
+    """The current snapshot of one app, and the lock its rebuilds take"""
+
+    def __init__(self):
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+def _published():
+    # Per app, so apps on different databases in one process never share a catalog
+    extensions = current_app.extensions
+    published = extensions.get('catalog_snapshot')
+    if published is None:
+        published = extensions.setdefault('catalog_snapshot', _Published())
+    return published
+
+def build_snapshot(version):
+    """Read every tool row into a new snapshot (not published)"""
+    columns = [Tool.id, Tool.is_verified] + [getattr(Tool, column) for column in SNAPSHOT_COLUMNS]
+    # Core rows, sorted here so listings and cursors use one ordering on every backend
+    rows = db.session.connection().execute(select(*columns)).all()
+    rows.sort(key=lambda row: (row.name, row.id))
+    return CatalogSnapshot(version, rows)
+
+def current_snapshot():
+    """The current app's published snapshot, rebuilt first if the catalog has changed.
+
+    One thread rebuilds while the others keep serving the previous
+    snapshot; only the very first build is waited for.
+    """
+    published = _published()
+    version = content_versions().get('tools', (0, None))[0]
+    snapshot = published.snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    if not published.lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        snapshot = published.snapshot
+        if snapshot is None or snapshot.version != version:
+            started = time.perf_counter()
+            snapshot = published.snapshot = build_snapshot(version)
+            current_app.logger.info('Catalog snapshot v%s: %d tools in %.0f ms', version,
+                                    len(snapshot), (time.perf_counter() - started) * 1000)
+        return snapshot
+    finally:
+        published.lock.release()
+
+def snapshot_stats():
+    snapshot = _published().snapshot
+    return snapshot.stats() if snapshot is not None else None
+
+@click.command('export-catalog')
+@click.argument('path', required=False)
+@with_appcontext
+def export_catalog_command(path):
+    """Write the catalog to a catalog file for hub.py (default data/tools.cat)."""
+    path = path or os.path.join(current_app.root_path, 'data', 'tools.cat')
+    snapshot = current_snapshot()
+    write_catalog(snapshot.records(), path)
+    click.echo(f'{path}: {len(snapshot)} tools (catalog version {snapshot.version})')
@@ -0,0 +1,162 @@
+"""
+Cold-start helpers
+Extensions that are imported and bound on first use, startup timings, and
+an import-time profiler for the serverless entry points:
+
+    python startup.py                      # breakdown for api/index.py
+    LEAN_STARTUP=0 python startup.py wsgi  # the full app, for comparison
+    python startup.py --json               # machine-readable, for tracking
+"""
+
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from flask import current_app
+
+class LazyExtension:
+    """Stand-in for a Flask extension that imports it on first use.
+
+    init_app binds eagerly; otherwise the first attribute access inside an
+    app context imports the module and binds the extension to that app.
+    """
+
+    def __init__(self, module, name, *init_args):
+        self._module = module
+        self._name = name
+        self._init_args = init_args
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        return self._bind(app)
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def _bind(self, app):
+        bound = app.extensions.setdefault('lazy_extensions', set())
+        if self._name not in bound:
+            with self._lock:
+                if self._instance is None:
+                    extension = getattr(importlib.import_module(self._module), self._name)
+                    self._instance = extension()
+                if self._name not in bound:
+                    self._instance.init_app(app, *self._init_args)
+                    bound.add(self._name)
+        return self._instance
+
+    def __getattr__(self, attr):
+        return getattr(self._bind(current_app._get_current_object()), attr)
+
+def record_startup(app, import_ms, create_started):
+    """Store cold-start timings on the app and log them"""
+    timings = {
+        'lean': app.config['LEAN_STARTUP'],
+        'import_ms': round(import_ms, 1),
+        'create_app_ms': round((time.perf_counter() - create_started) * 1000, 1),
+    }
+    timings['total_ms'] = round(timings['import_ms'] + timings['create_app_ms'], 1)
+    app.extensions['startup'] = timings
+    app.logger.info('startup: %(total_ms).1f ms (imports %(import_ms).1f ms, '
+                    'create_app %(create_app_ms).1f ms, lean=%(lean)s)', timings)
+    return timings
+
+# ==================== IMPORT-TIME PROFILER ====================
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def profile_imports(target='api.index', env=None):
+    """Import target in a fresh interpreter under -X importtime.
+
+    Returns the wall time of the run plus the modules the target pulled in,
+    each with its own and cumulative import time in milliseconds.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=root, env=dict(os.environ, **(env or {})),
+        capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(f'importing {target} failed:\n{result.stderr[-2000:]}')
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'depth': (len(indent) - 1) // 2,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+            })
+    return {'target': target, 'wall_ms': round(wall_ms, 1), 'modules': modules}
+
+def summarize(profile, top=15):
+    """Total import time, the slowest direct imports and per-package self time"""
+    modules = profile['modules']
+    packages = {}
+    for module in modules:
+        package = module['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + module['self_ms']
+
+    # A module is reported after everything it imported, one level deeper;
+    # walk back from the target to collect its direct imports
+    direct = []
+    index = next((i for i in range(len(modules) - 1, -1, -1)
+                  if modules[i]['module'] == profile['target']), None)
+    if index is not None:
+        depth = modules[index]['depth']
+        for module in reversed(modules[:index]):
+            if module['depth'] <= depth:
+                break
+            if module['depth'] == depth + 1:
+                direct.append(module)
+
+    return {
+        'target': profile['target'],
+        'wall_ms': profile['wall_ms'],
+        'import_ms': round(sum(m['self_ms'] for m in modules), 1),
+        'modules_imported': len(modules),
+        'slowest_imports': [
+            {'module': m['module'], 'cumulative_ms': round(m['cumulative_ms'], 1)}
+            for m in sorted(direct, key=lambda m: -m['cumulative_ms'])[:top]
+        ],
+        'packages': [
+            {'package': name, 'self_ms': round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+    }
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Import-time breakdown of an entry point')
+    parser.add_argument('target', nargs='?', default='api.index', help='module to import (default: api.index)')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    args = parser.parse_args(argv)
+
+    summary = summarize(profile_imports(args.target), args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{summary['target']}: {summary['import_ms']:.1f} ms importing "
+          f"{summary['modules_imported']} modules ({summary['wall_ms']:.1f} ms wall)")
+    print('\nslowest imports (cumulative ms)')
+    for row in summary['slowest_imports']:
+        print(f"  {row['cumulative_ms']:>8.1f}  {row['module']}")
+    print('\nby package (self ms)')
+    for row in summary['packages']:
+        print(f"  {row['self_ms']:>8.1f}  {row['package']}")
+
+if __name__ == '__main__':
+    main()
@@ -49,8 +49,12 @@ class HackerHub {
         // Search functionality
         const searchInput = document.querySelector('.search-input');
         if (searchInput) {
+            let searchTimer;
             searchInput.addEventListener('input', (e) => {
-                this.searchTools(e.target.value);
+                // Suggestions on every keystroke are cheap; full search waits for a pause
+                this.suggestTools(searchInput, e.target.value);
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => this.searchTools(e.target.value), 250);
             });
         }
 
@@ -91,6 +95,31 @@ class HackerHub {
         }
     }
 
+    async suggestTools(input, query) {
+        if (!query.trim()) return;
+        
+        try {
+            const response = await fetch(`${this.apiBase}/tools/autocomplete?q=${encodeURIComponent(query)}`);
+            const suggestions = await response.json();
+            
+            let list = document.getElementById('tool-suggestions');
+            if (!list) {
+                list = document.createElement('datalist');
+                list.id = 'tool-suggestions';
+                document.body.appendChild(list);
+                input.setAttribute('list', list.id);
+            }
+            list.innerHTML = '';
+            suggestions.forEach(suggestion => {
+                const option = document.createElement('option');
+                option.value = suggestion.label;
+                list.appendChild(option);
+            });
+        } catch (error) {
+            console.error('Error loading suggestions:', error);
+        }
+    }
+
     async searchTools(query) {
         if (query.length < 2) return;
         
@@ -0,0 +1,70 @@
+"""
+Dashboard stats service
+Per-user counts come from one aggregate round trip and are cached until
+the user follows a tool, posts or comments.
+"""
+
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from cache import LRUCache
+from catalog import VersionedCache, tool_summary
+from database import db, Tool, UserTool, Post, Comment
+
+_user_stats = LRUCache(maxsize=10000)
+
+def get_user_stats(user_id):
+    """Followed tools, posts and comments for a user"""
+    if user_id is None:
+        # Session-only guest: nothing stored yet
+        return {'followed_tools': 0, 'posts': 0, 'comments': 0}
+    
+    stats = _user_stats.get(user_id)
+    if stats is not None:
+        return stats
+
+    followed, posts, comments = db.session.execute(select(
+        select(func.count()).select_from(UserTool).where(UserTool.user_id == user_id).scalar_subquery(),
+        select(func.count()).select_from(Post).where(Post.user_id == user_id).scalar_subquery(),
+        select(func.count()).select_from(Comment).where(Comment.user_id == user_id).scalar_subquery()
+    )).one()
+
+    stats = {
+        'followed_tools': followed,
+        'posts': posts,
+        'comments': comments
+    }
+    _user_stats.set(user_id, stats, ttl=current_app.config.get('USER_STATS_CACHE_TTL'))
+    return stats
+
+def invalidate_user_stats(user_id):
+    _user_stats.pop(user_id)
+
+# ==================== WRITE TRACKING ====================
+
+@event.listens_for(Session, 'before_flush')
+def _track_user_writes(session, flush_context, instances):
+    """Collect users whose follows, posts or comments change in this transaction"""
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (UserTool, Post, Comment)) and obj.user_id is not None:
+            session.info.setdefault('stats_users', set()).add(obj.user_id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop('stats_users', ()):
+        invalidate_user_stats(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('stats_users', None)
+
+# ==================== CATALOG BLOCKS ====================
+
+def _build_recent_tools(limit):
+    tools = Tool.query.order_by(Tool.created_at.desc()).limit(limit).all()
+    return [tool_summary(tool) for tool in tools]
+
+_recent_tools = VersionedCache(_build_recent_tools)
+
+def get_recent_tools(limit=5):
+    return _recent_tools.get(limit)
@@ -0,0 +1,24 @@
+"""
+Shared fixtures: an app on a fresh SQLite database per test
+"""
+
+import pytest
+from app import create_app
+from config import Config
+from database import db
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/test.db'
+        SEED_CATALOG = ''
+        QUERY_BUDGET_RAISE = True
+        METRICS_DIR = ''
+
+    app = create_app(TestConfig, lean=True)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,72 @@
+"""
+Autocomplete prefix index ranking and limits
+"""
+
+import autocomplete
+from autocomplete import ALIAS_FACTOR, PrefixIndex, normalize, _tool_keys
+from catalog import bump_catalog_version
+from database import db, Tool
+
+def _index(tools):
+    """PrefixIndex over (name, weight) tools, owners ('tool', name)"""
+    index = PrefixIndex()
+    index.load([(('tool', name), _tool_keys(name), weight, {'label': name})
+                for name, weight in tools])
+    return index
+
+def _labels(results):
+    return [result['label'] for result in results]
+
+def test_normalize_folds_case_accents_and_punctuation():
+    assert normalize('  Nmap-Scan  Éngine!! ') == 'nmap scan engine'
+
+def test_heavier_matches_rank_first():
+    index = _index([('nmap', 1.0), ('nikto', 3.0), ('netcat', 2.0), ('hydra', 9.0)])
+
+    assert _labels(index.complete('n', 10)) == ['nikto', 'netcat', 'nmap']
+    assert _labels(index.complete('n', 2)) == ['nikto', 'netcat']
+
+def test_alias_hits_rank_below_name_hits_of_equal_weight():
+    index = _index([('burp suite', 1.0), ('suite runner', 1.0)])
+
+    assert _labels(index.complete('suite', 10)) == ['suite runner', 'burp suite']
+    assert ALIAS_FACTOR < 1.0
+
+def test_each_tool_is_suggested_once():
+    index = _index([('sql map sql', 1.0)])
+
+    assert _labels(index.complete('sql', 10)) == ['sql map sql']
+
+def test_dense_prefix_uses_weight_order():
+    tools = [(f'tool {i:04}', float(i)) for i in range(autocomplete.RANGE_SCAN_LIMIT + 50)]
+    index = _index(tools)
+
+    assert _labels(index.complete('tool', 3)) == [name for name, _ in tools[::-1][:3]]
+
+def test_non_positive_limit_returns_nothing_and_is_not_memoized():
+    index = _index([('nmap', 1.0), ('nikto', 2.0)])
+
+    for limit in (0, -1, -500):
+        assert index.complete('n', limit) == []
+    assert index._memo == {}
+
+def test_memo_is_capped(monkeypatch):
+    monkeypatch.setattr(autocomplete, 'MEMO_MAX_ENTRIES', 5)
+    index = _index([('nmap', 1.0)])
+
+    for limit in range(1, 20):
+        index.complete('n', limit)
+    assert len(index._memo) == 5
+
+def test_endpoint_clamps_limit(app):
+    with app.app_context():
+        db.session.add_all(Tool(name=f'nmap {i}', platform='Linux', category='Scanners',
+                                subcategory='Kali', description='d', difficulty='beginner')
+                           for i in range(30))
+        db.session.commit()
+    bump_catalog_version()  # rebuild the process-wide index from this app's database
+
+    client = app.test_client()
+    client.get('/api/health')
+    assert len(client.get('/api/tools/autocomplete?q=nm&limit=-5').get_json()) == 1
+    assert len(client.get('/api/tools/autocomplete?q=nm&limit=100').get_json()) == 20
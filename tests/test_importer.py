@@ -0,0 +1,69 @@
+"""
+Catalog importer upserts
+"""
+
+import io
+import json
+import pytest
+from database import db, Tool
+from importer import import_tools
+
+FULL = {'name': 'A', 'platform': 'Linux', 'category': 'Forensics', 'subcategory': 'Kali',
+        'description': 'first', 'difficulty': 'Beginner'}
+
+def _import(app, rows, **kwargs):
+    stream = io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+    with app.app_context():
+        return import_tools(stream, 'jsonl', log=lambda message: None, **kwargs)
+
+def _tools(app):
+    with app.app_context():
+        return {(tool.platform, tool.name): tool for tool in db.session.query(Tool)}
+
+@pytest.mark.parametrize('batch_size', [1, 1000])
+def test_partial_row_after_full_row_merges_whatever_the_batch_size(app, batch_size):
+    partial = {'name': 'A', 'platform': 'Linux', 'github_url': 'https://example.com/a'}
+    stats = _import(app, [FULL, partial], batch_size=batch_size)
+
+    assert stats['skipped'] == 0
+    tool = _tools(app)[('Linux', 'A')]
+    assert tool.description == 'first'
+    assert tool.github_url == 'https://example.com/a'
+
+def test_later_row_wins_for_fields_it_sets(app):
+    stats = _import(app, [FULL, dict(FULL, description='second')])
+
+    assert stats['duplicates'] == 1
+    assert stats['inserted'] == 1
+    assert _tools(app)[('Linux', 'A')].description == 'second'
+
+def test_update_keeps_fields_the_row_leaves_out(app):
+    _import(app, [dict(FULL, command='run-a', downloads=7)])
+    stats = _import(app, [{'name': 'A', 'platform': 'Linux', 'description': 'changed'}])
+
+    assert (stats['inserted'], stats['updated']) == (0, 1)
+    tool = _tools(app)[('Linux', 'A')]
+    assert (tool.description, tool.command, tool.downloads) == ('changed', 'run-a', 7)
+    assert tool.difficulty == 'beginner'
+
+def test_unchanged_rows_are_not_rewritten(app):
+    _import(app, [FULL])
+    stats = _import(app, [FULL])
+
+    assert (stats['inserted'], stats['updated'], stats['unchanged']) == (0, 0, 1)
+
+def test_same_name_on_another_platform_is_a_new_tool(app):
+    stats = _import(app, [FULL, dict(FULL, platform='Windows')])
+
+    assert stats['inserted'] == 2
+    assert set(_tools(app)) == {('Linux', 'A'), ('Windows', 'A')}
+
+def test_incomplete_new_tool_and_bad_lines_are_skipped(app):
+    stream = io.StringIO(json.dumps({'name': 'B', 'platform': 'Linux'}) + '\nnot json\n'
+                         + json.dumps({'name': 'C'}) + '\n')
+    with app.app_context():
+        stats = import_tools(stream, 'jsonl', log=lambda message: None)
+
+    assert stats['skipped'] == 3
+    assert stats['inserted'] == 0
+    assert _tools(app) == {}
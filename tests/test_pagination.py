@@ -0,0 +1,129 @@
+"""
+Keyset cursors: round trips, tampering, and the snapshot's equivalent pages
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+import pytest
+from database import db, User, Tool, Post
+from pagination import decode_cursor, encode_cursor, paginate_keyset
+from snapshot import build_snapshot
+
+TOOL_ORDER = [(Tool.name, False), (Tool.id, False)]
+POST_ORDER = [(Post.created_at, True), (Post.id, True)]
+
+def _raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def _add_tools(count=23):
+    # Repeated names, so pages must break ties on id
+    for i in range(count):
+        db.session.add(Tool(name=f'tool {i % 7}', platform='Linux' if i % 3 else 'Web',
+                            category='Forensics', subcategory='Kali', description='d',
+                            difficulty='beginner', is_verified=bool(i % 2)))
+    db.session.commit()
+
+def _walk(paginate, per_page):
+    """Ids page by page going forward, then the same pages walking back"""
+    forward, page = [], paginate(None, per_page)
+    forward.append([tool.id for tool in page.items])
+    while page.next_cursor:
+        page = paginate(page.next_cursor, per_page)
+        forward.append([tool.id for tool in page.items])
+    backward = [[tool.id for tool in page.items]]
+    while page.prev_cursor:
+        page = paginate(page.prev_cursor, per_page)
+        backward.append([tool.id for tool in page.items])
+    return forward, backward[::-1]
+
+def test_cursor_round_trip_keeps_values_and_direction():
+    when = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    values = ['name', 42, 1.5, None, when]
+
+    assert decode_cursor(encode_cursor(values, 'prev')) == (values, 'prev')
+    assert decode_cursor(encode_cursor(values)) == (values, 'next')
+
+@pytest.mark.parametrize('cursor', [
+    'not base64 !!',
+    _raw_cursor([1, 2]),
+    _raw_cursor({'k': {'a': 1}}),
+    _raw_cursor({'k': [['tool 1'], 1]}),
+    _raw_cursor({'k': [{'x': 1}, 1]}),
+    _raw_cursor({'k': [{'dt': 5}, 1]}),
+    _raw_cursor({'k': [True, 1]}),
+])
+def test_malformed_cursors_decode_to_the_first_page(cursor):
+    assert decode_cursor(cursor) == (None, 'next')
+
+def test_keyset_pages_cover_every_row_once_in_both_directions(app):
+    with app.app_context():
+        _add_tools()
+        expected = [tool.id for tool in Tool.query.order_by(Tool.name, Tool.id)]
+
+        forward, backward = _walk(
+            lambda cursor, per_page: paginate_keyset(Tool.query, TOOL_ORDER, cursor, per_page), 5)
+
+    assert [tool_id for page in forward for tool_id in page] == expected
+    assert backward == forward
+    assert all(len(page) == 5 for page in forward[:-1])
+
+@pytest.mark.parametrize('values', [['tool 1'], ['tool 1', 'x'], [3, 1], ['tool 1', 1, 2]])
+def test_cursor_values_that_do_not_fit_the_order_give_the_first_page(app, values):
+    with app.app_context():
+        _add_tools()
+        first = paginate_keyset(Tool.query, TOOL_ORDER, None, per_page=5)
+        page = paginate_keyset(Tool.query, TOOL_ORDER, encode_cursor(values), per_page=5)
+
+        assert [tool.id for tool in page.items] == [tool.id for tool in first.items]
+
+def test_descending_datetime_keys_round_trip(app):
+    with app.app_context():
+        user = User(username='poster', email='poster@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        start = datetime(2024, 1, 1)
+        for i in range(11):
+            # Pairs of posts share a timestamp
+            db.session.add(Post(title=f'p{i}', content='c', user_id=user.id,
+                                created_at=start + timedelta(minutes=i // 2)))
+        db.session.commit()
+        expected = [post.id for post in Post.query.order_by(Post.created_at.desc(), Post.id.desc())]
+
+        forward, backward = _walk(
+            lambda cursor, per_page: paginate_keyset(Post.query, POST_ORDER, cursor, per_page), 3)
+
+    assert [post_id for page in forward for post_id in page] == expected
+    assert backward == forward
+
+@pytest.mark.parametrize('filters', [{}, {'platform': 'Linux'}, {'platform': 'Web', 'category': 'Forensics'},
+                                     {'platform': 'Nowhere'}])
+def test_snapshot_pages_match_keyset_pages(app, filters):
+    with app.app_context():
+        _add_tools()
+        snapshot = build_snapshot(1)
+        positions = snapshot.filter(**filters)
+
+        def from_db(cursor, per_page):
+            return paginate_keyset(Tool.query.filter_by(**filters), TOOL_ORDER, cursor, per_page)
+
+        def from_snapshot(cursor, per_page):
+            return snapshot.paginate(positions, cursor, per_page)
+
+        assert _walk(from_snapshot, 4) == _walk(from_db, 4)
+
+        # Same cursors too, so either source can continue the other's listing
+        db_page, snapshot_page = from_db(None, 4), from_snapshot(None, 4)
+        assert (snapshot_page.next_cursor, snapshot_page.prev_cursor) == \
+            (db_page.next_cursor, db_page.prev_cursor)
+        assert snapshot_page.total == len(positions)
+
+def test_snapshot_ignores_tampered_cursors(app):
+    with app.app_context():
+        _add_tools()
+        snapshot = build_snapshot(1)
+        first = snapshot.paginate(snapshot.filter(), None, 5)
+
+        for cursor in (_raw_cursor({'k': [['x'], 1]}), encode_cursor(['tool 1']), encode_cursor([1, 'x'])):
+            page = snapshot.paginate(snapshot.filter(), cursor, 5)
+            assert [tool.id for tool in page.items] == [tool.id for tool in first.items]
@@ -0,0 +1,83 @@
+"""
+Query bounds for pages that walk relationships
+Each page is rendered over many rows with a template that touches the
+same relationships as the real one; an N+1 shows up as a count that
+grows with the rows and fails the bound.
+"""
+
+from jinja2 import ChoiceLoader, DictLoader
+from database import db, User, Tool, UserTool, Post, Comment
+from querybudget import assert_max_queries
+
+ROWS = 12
+
+TEMPLATES = {
+    'my_tools.html': '{% for tool in tools %}{{ tool.name }} {{ tool.platform }}\n{% endfor %}',
+    'post_detail.html': (
+        '{{ post.title }} by {{ post.author.username }}\n'
+        '{% for comment in comments recursive %}'
+        '{{ comment.author.username }}: {{ comment.content }}\n{{ loop(comment.replies) }}'
+        '{% endfor %}'
+    ),
+}
+
+def _user(name):
+    user = User(username=name, email=f'{name}@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+def _login(client, user_id):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+def _render_with_test_templates(app):
+    app.jinja_loader = ChoiceLoader([app.jinja_loader, DictLoader(TEMPLATES)])
+
+def test_my_tools_queries_do_not_grow_with_followed_tools(app):
+    _render_with_test_templates(app)
+    with app.app_context():
+        user = _user('follower')
+        for i in range(ROWS):
+            tool = Tool(name=f'tool {i}', platform='Linux', category='Forensics',
+                        subcategory='Kali', description='d', difficulty='beginner')
+            db.session.add(tool)
+            db.session.flush()
+            db.session.add(UserTool(user_id=user.id, tool_id=tool.id))
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    _login(client, user_id)
+    client.get('/api/health')  # runs first-request setup outside the counted block
+
+    with assert_max_queries(6):
+        response = client.get('/my-tools')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).count('Linux') == ROWS
+
+def test_view_post_loads_the_thread_in_bounded_queries(app):
+    _render_with_test_templates(app)
+    with app.app_context():
+        authors = [_user(f'author{i}') for i in range(ROWS)]
+        post = Post(title='thread', content='c', user_id=authors[0].id)
+        db.session.add(post)
+        db.session.flush()
+        for i, author in enumerate(authors):
+            comment = Comment(content=f'comment {i}', user_id=author.id, post_id=post.id)
+            db.session.add(comment)
+            db.session.flush()
+            db.session.add(Comment(content=f'reply {i}', user_id=authors[-1 - i].id,
+                                   post_id=post.id, parent_id=comment.id))
+        db.session.commit()
+        post_id = post.id
+
+    client = app.test_client()
+    client.get('/api/health')
+
+    with assert_max_queries(6):
+        response = client.get(f'/community/post/{post_id}')
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    assert text.count('comment ') == ROWS and text.count('reply ') == ROWS
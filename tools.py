@@ -1,72 +1,138 @@
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, g, session
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
+from guests import persistent_user
 from database import db, Tool, UserTool
+from search import search_tools
+from counters import hit_counter
+from catalog import tool_summary
+from pagination import freeze_page
+from autocomplete import complete
+from conditional import conditional, content_versions
+from similarity import related_tool_ids
+from snapshot import current_snapshot
+from fragments import fragment_cache
 import json
 
 tools_bp = Blueprint('tools', __name__)
 
+def _listing_filters(args):
+    """Normalized platform/category/difficulty/search filters from request args"""
+    return {
+        'platform': args.get('platform', 'all'),
+        'category': args.get('category', 'all'),
+        'difficulty': args.get('difficulty', 'all'),
+        'search': ' '.join(args.get('search', '').split())
+    }
+
+def _filtered_tools(args):
+    """Apply the platform/category/difficulty/search filters from request args"""
+    filters = _listing_filters(args)
+    selected = {column: filters[column] for column in ('platform', 'category', 'difficulty')
+                if filters[column] != 'all'}
+    
+    if filters['search']:
+        # Full-text ranking lives in the database; relevance order has no
+        # seek key, so search results stay page-based
+        query = Tool.query.filter_by(**selected)
+        page = args.get('page', 1, type=int)
+        tools = search_tools(query, filters['search']).paginate(page=page, per_page=20, error_out=False)
+    else:
+        # Browsing is served from the catalog snapshot, keyset-paginated on (name, id)
+        snapshot = current_snapshot()
+        tools = snapshot.paginate(snapshot.filter(**selected), args.get('cursor'), per_page=20)
+    
+    return tools, filters
+
+def _listing_key(args):
+    """Filter tuple identifying one listing page"""
+    filters = _listing_filters(args)
+    if filters['search']:
+        position = args.get('page', 1, type=int)
+    else:
+        position = args.get('cursor') or ''
+    return (filters['platform'], filters['category'], filters['difficulty'], filters['search'], position)
+
+def _listing_data(args):
+    tools, current_filters = _filtered_tools(args)
+    return freeze_page(tools, tool_summary), current_filters
+
 @tools_bp.route('/tools')
+@conditional('tools')
 def tools_list():
     """Browse all tools"""
-    page = request.args.get('page', 1, type=int)
-    platform = request.args.get('platform', 'all')
-    category = request.args.get('category', 'all')
-    difficulty = request.args.get('difficulty', 'all')
-    search = request.args.get('search', '')
-    
-    query = Tool.query
-    
-    # Apply filters
-    if platform != 'all':
-        query = query.filter_by(platform=platform)
-    if category != 'all':
-        query = query.filter_by(category=category)
-    if difficulty != 'all':
-        query = query.filter_by(difficulty=difficulty)
-    if search:
-        query = query.filter(Tool.name.ilike(f'%{search}%') | Tool.description.ilike(f'%{search}%'))
+    # Everything below is shared until the next catalog write bumps the version
+    version = content_versions().get('tools', (0, None))[0]
+    key = (version,) + _listing_key(request.args)
+    
+    # Anonymous pages are identical for every visitor, so keep the whole page
+    shared = not current_user.is_authenticated and '_flashes' not in session
+    if shared:
+        html = fragment_cache.get(('html',) + key)
+        if html is not None:
+            return html
+    
+    tools, current_filters = fragment_cache.get_or_build(('data',) + key,
+                                                         lambda: _listing_data(request.args))
     
     # Get unique values for filter dropdowns
-    platforms = [p[0] for p in db.session.query(Tool.platform).distinct().all()]
-    categories = [c[0] for c in db.session.query(Tool.category).distinct().all()]
+    snapshot = current_snapshot()
+    platforms, categories = snapshot.platforms, snapshot.categories
     difficulties = ['beginner', 'intermediate', 'advanced']
     
-    # Paginate results
-    tools = query.order_by(Tool.name).paginate(page=page, per_page=20, error_out=False)
-    
-    return render_template('tools.html',
+    html = render_template('tools.html',
                          tools=tools,
                          platforms=platforms,
                          categories=categories,
                          difficulties=difficulties,
-                         current_filters={
-                             'platform': platform,
-                             'category': category,
-                             'difficulty': difficulty,
-                             'search': search
-                         })
+                         current_filters=current_filters)
+    if shared:
+        fragment_cache.set(('html',) + key, html)
+    return html
+
+@tools_bp.route('/api/tools')
+@conditional('tools', personalized=False)
+def api_tools():
+    """API endpoint for browsing tools, cursor-paginated"""
+    tools, _ = _filtered_tools(request.args)
+    
+    return jsonify({
+        'items': [{
+            'id': tool.id,
+            'name': tool.name,
+            'platform': tool.platform,
+            'category': tool.category,
+            'difficulty': tool.difficulty,
+            'description': tool.description[:150]
+        } for tool in tools.items],
+        'next_cursor': getattr(tools, 'next_cursor', None),
+        'prev_cursor': getattr(tools, 'prev_cursor', None),
+        'total': tools.total
+    })
 
 @tools_bp.route('/tools/<int:tool_id>')
+@conditional('tools')
 def tool_detail(tool_id):
     """View tool details"""
     tool = Tool.query.get_or_404(tool_id)
     
     # Check if user follows this tool
     is_following = False
-    if current_user.is_authenticated:
+    if current_user.is_authenticated and current_user.id is not None:
         is_following = UserTool.query.filter_by(user_id=current_user.id, tool_id=tool.id).first() is not None
     
-    # Increment view count (or download count)
-    tool.downloads += 1
-    db.session.commit()
+    # Increment view count (or download count), written behind in batches
+    hit_counter.increment(Tool.downloads, tool.id)
+    hit_counter.apply_pending(tool, Tool.downloads)
     
-    # Get related tools
-    related_tools = Tool.query.filter_by(platform=tool.platform, category=tool.category).filter(Tool.id != tool.id).limit(4).all()
+    # Get related tools: precomputed neighbors, same platform/category until the job has run
+    snapshot = current_snapshot()
+    related = snapshot.tools(related_tool_ids(tool.id, limit=4)) or snapshot.alike(tool.id, limit=4)
     
     return render_template('tool_detail.html',
                          tool=tool,
                          is_following=is_following,
-                         related_tools=related_tools)
+                         related_tools=related)
 
 @tools_bp.route('/tools/follow/<int:tool_id>', methods=['POST'])
 @login_required
@@ -74,7 +140,8 @@ def follow_tool(tool_id):
     """Follow or unfollow a tool"""
     tool = Tool.query.get_or_404(tool_id)
     
-    existing = UserTool.query.filter_by(user_id=current_user.id, tool_id=tool.id).first()
+    user = persistent_user()
+    existing = UserTool.query.filter_by(user_id=user.id, tool_id=tool.id).first()
     
     if existing:
         # Unfollow
@@ -82,7 +149,7 @@ def follow_tool(tool_id):
         action = 'unfollowed'
     else:
         # Follow
-        user_tool = UserTool(user_id=current_user.id, tool_id=tool.id)
+        user_tool = UserTool(user_id=user.id, tool_id=tool.id)
         db.session.add(user_tool)
         action = 'followed'
     
@@ -98,31 +165,39 @@ def follow_tool(tool_id):
 @login_required
 def my_tools():
     """User's followed tools"""
-    user_tools = UserTool.query.filter_by(user_id=current_user.id).all()
+    user_tools = (UserTool.query.filter_by(user_id=current_user.id)
+                  .options(joinedload(UserTool.tool))
+                  .all())
     tools = [ut.tool for ut in user_tools]
     
     return render_template('my_tools.html', tools=tools)
 
 @tools_bp.route('/api/tools/random')
+@conditional('tools', personalized=False, rotate=60)
 def random_tools():
     """Get random tools for homepage"""
     import random
-    tools = Tool.query.filter_by(is_verified=True).all()
-    random_tools = random.sample(tools, min(6, len(tools)))
+    snapshot = current_snapshot()
+    tool_ids = snapshot.verified_ids
+    # Same pick for everyone within a rotation, so the response can be cached
+    rng = random.Random(g.content_etag)
+    sample_ids = rng.sample(tool_ids, min(6, len(tool_ids)))
     
     tools_data = []
-    for tool in random_tools:
+    for tool in snapshot.tools(sample_ids):
+        description = tool.description
         tools_data.append({
             'id': tool.id,
             'name': tool.name,
             'platform': tool.platform,
             'difficulty': tool.difficulty,
-            'description': tool.description[:100] + '...' if len(tool.description) > 100 else tool.description
+            'description': description[:100] + '...' if len(description) > 100 else description
         })
     
     return jsonify(tools_data)
 
 @tools_bp.route('/api/tools/search')
+@conditional('tools', personalized=False)
 def api_search():
     """API endpoint for tool search"""
     query = request.args.get('q', '')
@@ -131,12 +206,7 @@ def api_search():
     if not query or len(query) < 2:
         return jsonify([])
     
-    tools = Tool.query.filter(
-        Tool.name.ilike(f'%{query}%') |
-        Tool.description.ilike(f'%{query}%') |
-        Tool.category.ilike(f'%{query}%') |
-        Tool.subcategory.ilike(f'%{query}%')
-    ).limit(limit).all()
+    tools = search_tools(Tool.query, query).limit(limit).all()
     
     results = []
     for tool in tools:
@@ -150,3 +220,12 @@ def api_search():
         })
     
     return jsonify(results)
+
+@tools_bp.route('/api/tools/autocomplete')
+@conditional('tools', personalized=False)
+def api_autocomplete():
+    """API endpoint for search-as-you-type suggestions"""
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 8, type=int), 20))
+    
+    return jsonify(complete(query, limit))